@@ -1,17 +1,24 @@
 from __future__ import annotations
 
 import argparse
-from typing import Sequence
+import sys
+from typing import Callable, Sequence
 
-from wise.db import models
+
+# ``wise.db.models`` is imported inside each command so that ``--help`` and
+# argument errors never pay for loading the DB layer.
 
 
 def cmd_show(args: argparse.Namespace) -> None:
+    from wise.db import models
+
     tables = models.list_tables()
     print("tables:", tables)
 
 
 def cmd_drop_legacy(args: argparse.Namespace) -> None:
+    from wise.db import models
+
     dropped = models.drop_legacy_tables()
     if dropped:
         print("dropped:", dropped)
@@ -20,32 +27,44 @@ def cmd_drop_legacy(args: argparse.Namespace) -> None:
 
 
 def cmd_reinit(args: argparse.Namespace) -> None:
+    from wise.db import models
+
     models.init_db()
     print("reinitialized schema for: accounts, sessions, messages")
 
 
+COMMANDS: dict[str, tuple[str, Callable[[argparse.Namespace], None]]] = {
+    "show": ("List user tables", cmd_show),
+    "drop-legacy": ("Drop legacy tables (datasets, queries, analysis)", cmd_drop_legacy),
+    "reinit": ("Ensure current schema exists (accounts/sessions/messages)", cmd_reinit),
+}
+
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Wise DB maintenance")
     sub = p.add_subparsers(dest="cmd", required=True)
 
-    s1 = sub.add_parser("show", help="List user tables")
-    s1.set_defaults(func=cmd_show)
-
-    s2 = sub.add_parser("drop-legacy", help="Drop legacy tables (datasets, queries, analysis)")
-    s2.set_defaults(func=cmd_drop_legacy)
-
-    s3 = sub.add_parser("reinit", help="Ensure current schema exists (accounts/sessions/messages)")
-    s3.set_defaults(func=cmd_reinit)
+    for name, (help_text, func) in COMMANDS.items():
+        s = sub.add_parser(name, help=help_text)
+        s.set_defaults(func=func)
 
     return p
 
 
 def main(argv: Sequence[str] | None = None) -> None:
+    args = list(sys.argv[1:] if argv is None else argv)
+    # Fast path: a bare subcommand dispatches directly without building the
+    # parser. ``--help``, unknown commands and extra arguments fall through to
+    # the full parser so usage/errors stay identical.
+    if len(args) == 1 and args[0] in COMMANDS:
+        _, func = COMMANDS[args[0]]
+        func(argparse.Namespace(cmd=args[0], func=func))
+        return
+
     parser = build_parser()
-    args = parser.parse_args(argv)
-    args.func(args)
+    ns = parser.parse_args(args)
+    ns.func(ns)
 
 
 if __name__ == "__main__":
     main()
-
@@ -13,9 +13,10 @@ def main() -> None:
 
     sid = models.create_session(acc_id)
     print("session id:", sid)
-    models.add_message(sid, "user", "Hello")
-    models.add_message(sid, "assistant", "Hi there")
-    print("messages:", [dict(r) for r in models.list_messages(sid)])
+    models.add_messages(sid, [("user", "Hello"), ("assistant", "Hi there")])
+    print("messages:")
+    for r in models.list_messages(sid):
+        print(f"  [{r['id']}] {r['role']}: {r['content']}")
 
     # Design doc compliant: artifacts like datasets/queries/analysis are stored
     # on filesystem. No DB-side verification for those here.
@@ -0,0 +1,70 @@
+import sys
+import types
+
+
+def _install_google_stubs() -> None:
+    google_module = types.ModuleType("google")
+    auth_module = types.ModuleType("google.auth")
+    transport_module = types.ModuleType("google.auth.transport")
+    requests_module = types.ModuleType("google.auth.transport.requests")
+
+    class _Request:  # pragma: no cover - simple stub
+        pass
+
+    class _AuthorizedSession:  # pragma: no cover - simple stub
+        def __init__(self, *args, **kwargs) -> None:
+            self.args = args
+            self.kwargs = kwargs
+
+        def request(self, *args, **kwargs):
+            raise RuntimeError("Network access not available in tests")
+
+    requests_module.Request = _Request
+    requests_module.AuthorizedSession = _AuthorizedSession
+
+    oauth_module = types.ModuleType("google.oauth2")
+    credentials_module = types.ModuleType("google.oauth2.credentials")
+    oauthlib_module = types.ModuleType("google_auth_oauthlib")
+    oauthlib_flow_module = types.ModuleType("google_auth_oauthlib.flow")
+
+    class _Credentials:  # pragma: no cover - simple stub
+        def __init__(self, *args, **kwargs) -> None:
+            self.args = args
+            self.kwargs = kwargs
+
+        def refresh(self, *args, **kwargs) -> None:
+            return None
+
+    credentials_module.Credentials = _Credentials
+
+    class _InstalledAppFlow:  # pragma: no cover - simple stub
+        @classmethod
+        def from_client_secrets_file(cls, *args, **kwargs):
+            return cls()
+
+        def run_local_server(self, *args, **kwargs):
+            class _Creds:  # pragma: no cover - simple stub
+                refresh_token = "stub-token"
+
+            return _Creds()
+
+    oauthlib_flow_module.InstalledAppFlow = _InstalledAppFlow
+    oauthlib_module.flow = oauthlib_flow_module
+
+    google_module.auth = auth_module
+    google_module.oauth2 = oauth_module
+
+    sys.modules.setdefault("google", google_module)
+    sys.modules.setdefault("google.auth", auth_module)
+    sys.modules.setdefault("google.auth.transport", transport_module)
+    sys.modules.setdefault("google.auth.transport.requests", requests_module)
+    sys.modules.setdefault("google.oauth2", oauth_module)
+    sys.modules.setdefault("google.oauth2.credentials", credentials_module)
+    sys.modules.setdefault("google_auth_oauthlib", oauthlib_module)
+    sys.modules.setdefault("google_auth_oauthlib.flow", oauthlib_flow_module)
+
+
+def pytest_configure(config) -> None:
+    # Install once per session, before any test module imports wise.auth/wise.bq
+    if "google_auth_oauthlib.flow" not in sys.modules:
+        _install_google_stubs()
@@ -0,0 +1,329 @@
+import json
+
+import pytest
+
+from wise.bq import client as bq_client
+
+BASE_URL = bq_client.BQClient.BASE_URL
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode("utf-8")
+        self.text = self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeSession:
+    """Replays canned responses keyed by (method, url suffix, pageToken).
+
+    A list value is consumed one response per call.
+    """
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    def request(self, method, url, params=None, json=None, timeout=None):
+        path = url[len(BASE_URL) :]
+        token = (params or {}).get("pageToken")
+        self.calls.append((method, path, dict(params or {}), json))
+        payload = self.routes[(method, path, token)]
+        if isinstance(payload, list):
+            payload = payload.pop(0)
+        return FakeResponse(payload)
+
+
+SCHEMA = {"fields": [{"name": "id", "type": "INTEGER"}, {"name": "name", "type": "STRING"}]}
+
+
+def _row(*values):
+    return {"f": [{"v": v} for v in values]}
+
+
+@pytest.fixture()
+def make_client(monkeypatch):
+    def _make(routes):
+        session = FakeSession(routes)
+        monkeypatch.setattr(bq_client, "_metadata_cache", bq_client._TTLCache(maxsize=16, ttl=60.0))
+        monkeypatch.setattr(
+            bq_client,
+            "_create_authorized_session",
+            lambda account_id, db_path=None: (session, None, {"id": 1}),
+        )
+        return bq_client.BQClient("demo"), session
+
+    return _make
+
+
+QUERY_ROUTES = {
+    ("POST", "/projects/demo/queries", None): {
+        "jobReference": {"jobId": "job-1"},
+        "jobComplete": True,
+        "schema": SCHEMA,
+        "totalRows": "3",
+        "rows": [_row("1", "a"), _row("2", "b")],
+        "pageToken": "p2",
+    },
+    ("GET", "/projects/demo/queries/job-1", "p2"): {
+        "jobComplete": True,
+        "totalRows": "3",
+        "rows": [_row("3", "c")],
+    },
+}
+
+
+def test_run_sql_follows_page_tokens(make_client):
+    client, _ = make_client(QUERY_ROUTES)
+
+    result = client.run_sql("SELECT 1")
+
+    assert result["jobId"] == "job-1"
+    assert result["totalRows"] == 3
+    assert result["rows"] == [
+        {"id": "1", "name": "a"},
+        {"id": "2", "name": "b"},
+        {"id": "3", "name": "c"},
+    ]
+
+
+def test_iter_rows_fetches_next_page_lazily(make_client):
+    client, session = make_client(QUERY_ROUTES)
+
+    rows = client.iter_rows("SELECT 1")
+    assert len(session.calls) == 1
+    assert next(rows) == {"id": "1", "name": "a"}
+    assert next(rows) == {"id": "2", "name": "b"}
+    assert len(session.calls) == 1
+    assert list(rows) == [{"id": "3", "name": "c"}]
+    assert len(session.calls) == 2
+
+
+def test_iter_query_streams_pages_from_module_helper(make_client):
+    _, session = make_client(QUERY_ROUTES)
+
+    rows = bq_client.iter_query("SELECT 1", project_id="demo", max_results=2)
+    assert [call[1] for call in session.calls] == ["/projects/demo/queries"]
+    assert session.calls[0][3]["maxResults"] == 2
+    assert [next(rows), next(rows)] == [{"id": "1", "name": "a"}, {"id": "2", "name": "b"}]
+    assert len(session.calls) == 1
+    assert list(rows) == [{"id": "3", "name": "c"}]
+    method, path, params, _ = session.calls[1]
+    assert (method, path, params["pageToken"]) == ("GET", "/projects/demo/queries/job-1", "p2")
+
+
+def test_run_sql_waits_for_incomplete_job(make_client, monkeypatch):
+    monkeypatch.setattr(bq_client.time, "sleep", lambda _: None)
+    client, _ = make_client(
+        {
+            ("POST", "/projects/demo/queries", None): {
+                "jobReference": {"jobId": "job-1"},
+                "jobComplete": False,
+            },
+            ("GET", "/projects/demo/queries/job-1", None): {
+                "jobComplete": True,
+                "schema": SCHEMA,
+                "totalRows": "1",
+                "rows": [_row("1", None)],
+            },
+        }
+    )
+
+    result = client.run_sql("SELECT 1")
+
+    assert result["schema"] == SCHEMA["fields"]
+    assert result["rows"] == [{"id": "1", "name": None}]
+    assert result["totalRows"] == 1
+
+
+def test_poll_backs_off_exponentially(make_client, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(bq_client.time, "sleep", sleeps.append)
+    pending = {"jobComplete": False}
+    client, session = make_client(
+        {
+            ("POST", "/projects/demo/queries", None): {"jobReference": {"jobId": "job-1"}, "jobComplete": False},
+            ("GET", "/projects/demo/queries/job-1", None): [
+                pending,
+                pending,
+                pending,
+                {"jobComplete": True, "schema": SCHEMA, "rows": []},
+            ],
+        }
+    )
+
+    client.run_sql("SELECT 1")
+
+    assert sleeps == pytest.approx([0.1, 0.15, 0.225, 0.3375])
+    assert session.calls[0][3]["timeoutMs"] == client.POLL_TIMEOUT_MS
+    assert all(call[2].get("timeoutMs") == client.POLL_TIMEOUT_MS for call in session.calls[1:])
+
+
+def test_list_tables_paginates(make_client):
+    client, _ = make_client(
+        {
+            ("GET", "/projects/demo/datasets/sales/tables", None): {
+                "tables": [{"tableReference": {"tableId": "orders"}}],
+                "nextPageToken": "t2",
+            },
+            ("GET", "/projects/demo/datasets/sales/tables", "t2"): {
+                "tables": [{"tableReference": {"tableId": "refunds"}}],
+            },
+        }
+    )
+
+    assert client.list_tables("sales") == ["orders", "refunds"]
+
+
+def test_metadata_snapshot_collects_tables_in_listing_order(make_client, monkeypatch):
+    client, _ = make_client(
+        {
+            ("GET", "/projects/demo/datasets/sales/tables", None): {
+                "tables": [{"tableReference": {"tableId": t}} for t in ("orders", "refunds", "items")],
+            },
+        }
+    )
+    monkeypatch.setattr(bq_client, "BQClient", lambda **kwargs: client)
+    # INFORMATION_SCHEMA covers two tables; "items" falls back to tables.get
+    monkeypatch.setattr(
+        client,
+        "list_tables_with_schema",
+        lambda ds: {t: [{"name": f"{t}_id", "type": "STRING"}] for t in ("orders", "refunds")},
+    )
+    monkeypatch.setattr(client, "get_table_schema", lambda ds, t: [{"name": f"{t}_id", "type": "INT64"}])
+    monkeypatch.setattr(client, "sample_rows", lambda ds, t, max_results: [{f"{t}_id": max_results}])
+
+    snapshot = bq_client.metadata_snapshot("demo", datasets=["sales"], sample_n=2)
+
+    tables = snapshot["datasets"]["sales"]["tables"]
+    assert list(tables) == ["orders", "refunds", "items"]
+    assert tables["refunds"] == {
+        "schema": [{"name": "refunds_id", "type": "STRING"}],
+        "sampleRows": [{"refunds_id": 2}],
+    }
+    assert tables["items"]["schema"] == [{"name": "items_id", "type": "INT64"}]
+
+
+def test_list_tables_with_schema_groups_columns(make_client):
+    schema = {
+        "fields": [
+            {"name": n, "type": "STRING"}
+            for n in ("table_name", "column_name", "data_type", "is_nullable", "description")
+        ]
+    }
+    client, session = make_client(
+        {
+            ("POST", "/projects/demo/queries", None): {
+                "jobReference": {"jobId": "job-1"},
+                "jobComplete": True,
+                "schema": schema,
+                "rows": [
+                    _row("orders", "order_id", "STRING", "NO", "注文ID"),
+                    _row("orders", "tags", "ARRAY<STRING>", "NO", None),
+                    _row("orders", "shipping", "STRUCT<city STRING, zip STRING>", "YES", None),
+                    _row("refunds", "amount", "INT64", "YES", None),
+                    _row("refunds", "note", "STRING(200)", "YES", None),
+                    _row("refunds", "items", "ARRAY<STRUCT<sku STRING>>", "NO", None),
+                ],
+            },
+        }
+    )
+
+    schemas = client.list_tables_with_schema("sales")
+
+    sql = session.calls[0][3]["query"]
+    assert "INFORMATION_SCHEMA.COLUMNS" in sql
+    assert "c.is_system_defined = 'NO'" in sql
+    # Type names match the legacy vocabulary that get_table_schema reports.
+    assert schemas == {
+        "orders": [
+            {"name": "order_id", "type": "STRING", "mode": "REQUIRED", "description": "注文ID"},
+            {"name": "tags", "type": "STRING", "mode": "REPEATED", "description": None},
+            {"name": "shipping", "type": "RECORD", "mode": "NULLABLE", "description": None},
+        ],
+        "refunds": [
+            {"name": "amount", "type": "INTEGER", "mode": "NULLABLE", "description": None},
+            {"name": "note", "type": "STRING", "mode": "NULLABLE", "description": None},
+            {"name": "items", "type": "RECORD", "mode": "REPEATED", "description": None},
+        ],
+    }
+
+
+def test_get_table_schema_is_cached_until_ttl(make_client, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(bq_client.time, "monotonic", lambda: now[0])
+    client, session = make_client({("GET", "/projects/demo/datasets/sales/tables/orders", None): {"schema": SCHEMA}})
+
+    assert client.get_table_schema("sales", "orders") == SCHEMA["fields"]
+    assert client.get_table_schema("sales", "orders") == SCHEMA["fields"]
+    assert len(session.calls) == 1
+
+    now[0] += 60.0
+    client.get_table_schema("sales", "orders")
+    assert len(session.calls) == 2
+
+
+def test_metadata_cache_is_shared_across_clients(make_client):
+    _, session = make_client(
+        {
+            ("GET", "/projects/demo/datasets", None): {"datasets": [{"datasetReference": {"datasetId": "sales"}}]},
+            ("GET", "/projects/demo/datasets/sales/tables/orders", None): {"schema": SCHEMA},
+        }
+    )
+
+    for _ in range(2):
+        client = bq_client.BQClient("demo")
+        assert client.list_datasets() == ["sales"]
+        assert client.get_table_schema("sales", "orders") == SCHEMA["fields"]
+    assert len(session.calls) == 2
+
+
+def test_format_rows_pads_short_rows_and_skips_unnamed_fields():
+    fields = [{"name": "id"}, {"type": "STRING"}, {"name": "name"}]
+    rows = [_row("1", "x", "a"), _row("2")]
+
+    assert bq_client.BQClient._format_rows(rows, fields) == [
+        {"id": "1", "name": "a"},
+        {"id": "2", "name": None},
+    ]
+
+
+def test_authorized_session_reused_and_refreshed_in_place(monkeypatch):
+    class FakeCredentials:
+        def __init__(self):
+            self.valid = True
+            self.refreshes = 0
+
+        def refresh(self, request):
+            self.refreshes += 1
+            self.valid = True
+
+    built = []
+
+    def fake_build(client_info, refresh_token):
+        built.append(refresh_token)
+        return FakeCredentials()
+
+    account = {"id": 1, "refresh_token": "tok"}
+    monkeypatch.setattr(bq_client, "_session_cache", {})
+    monkeypatch.setattr(bq_client, "_resolve_account", lambda account_id, db_path=None: account)
+    monkeypatch.setattr(bq_client, "_load_client_info", lambda: {})
+    monkeypatch.setattr(bq_client, "_build_credentials", fake_build)
+    monkeypatch.setattr(bq_client, "AuthorizedSession", lambda creds: FakeSession({}))
+    monkeypatch.setattr(bq_client, "_configure_session", lambda session: None)
+
+    session, creds, _ = bq_client._create_authorized_session(1)
+    creds.valid = False
+    again, same_creds, _ = bq_client._create_authorized_session(1)
+
+    assert again is session and same_creds is creds
+    assert creds.refreshes == 1
+    assert built == ["tok"]
+
+    account["refresh_token"] = "new"
+    replaced, _, _ = bq_client._create_authorized_session(1)
+    assert replaced is not session
+    assert built == ["tok", "new"]
@@ -1,71 +1,3 @@
-import sys
-import types
-
-
-def _install_google_stubs() -> None:
-    google_module = types.ModuleType("google")
-    auth_module = types.ModuleType("google.auth")
-    transport_module = types.ModuleType("google.auth.transport")
-    requests_module = types.ModuleType("google.auth.transport.requests")
-
-    class _Request:  # pragma: no cover - simple stub
-        pass
-
-    class _AuthorizedSession:  # pragma: no cover - simple stub
-        def __init__(self, *args, **kwargs) -> None:
-            self.args = args
-            self.kwargs = kwargs
-
-        def request(self, *args, **kwargs):
-            raise RuntimeError("Network access not available in tests")
-
-    requests_module.Request = _Request
-    requests_module.AuthorizedSession = _AuthorizedSession
-
-    oauth_module = types.ModuleType("google.oauth2")
-    credentials_module = types.ModuleType("google.oauth2.credentials")
-    oauthlib_module = types.ModuleType("google_auth_oauthlib")
-    oauthlib_flow_module = types.ModuleType("google_auth_oauthlib.flow")
-
-    class _Credentials:  # pragma: no cover - simple stub
-        def __init__(self, *args, **kwargs) -> None:
-            self.args = args
-            self.kwargs = kwargs
-
-        def refresh(self, *args, **kwargs) -> None:
-            return None
-
-    credentials_module.Credentials = _Credentials
-
-    class _InstalledAppFlow:  # pragma: no cover - simple stub
-        @classmethod
-        def from_client_secrets_file(cls, *args, **kwargs):
-            return cls()
-
-        def run_local_server(self, *args, **kwargs):
-            class _Creds:  # pragma: no cover - simple stub
-                refresh_token = "stub-token"
-
-            return _Creds()
-
-    oauthlib_flow_module.InstalledAppFlow = _InstalledAppFlow
-    oauthlib_module.flow = oauthlib_flow_module
-
-    google_module.auth = auth_module
-    google_module.oauth2 = oauth_module
-
-    sys.modules.setdefault("google", google_module)
-    sys.modules.setdefault("google.auth", auth_module)
-    sys.modules.setdefault("google.auth.transport", transport_module)
-    sys.modules.setdefault("google.auth.transport.requests", requests_module)
-    sys.modules.setdefault("google.oauth2", oauth_module)
-    sys.modules.setdefault("google.oauth2.credentials", credentials_module)
-    sys.modules.setdefault("google_auth_oauthlib", oauthlib_module)
-    sys.modules.setdefault("google_auth_oauthlib.flow", oauthlib_flow_module)
-
-
-_install_google_stubs()
-
 from wise.chat import commands
 from wise.metadata import manager as metadata_manager
 
@@ -95,18 +27,20 @@ def test_init_happy_path(monkeypatch, tmp_path):
 
     captured = {}
 
-    def fake_metadata_snapshot(**kwargs):
-        captured.update(kwargs)
-        return {"projectId": kwargs["project_id"], "location": kwargs.get("location"), "datasets": {}}
+    def fake_iter_metadata_snapshot(project_id, **kwargs):
+        captured.update(kwargs, project_id=project_id)
+        yield ("dataset", "sales")
+        yield ("table", "sales", "orders", [{"name": "id", "type": "STRING"}], [{"id": "1"}])
+        yield ("dataset", "marketing")
 
-    monkeypatch.setattr(commands.bq_client, "metadata_snapshot", fake_metadata_snapshot)
+    monkeypatch.setattr(commands.bq_client, "iter_metadata_snapshot", fake_iter_metadata_snapshot)
 
-    save_path = tmp_path / "project" / "demo" / "metadata.md"
-    monkeypatch.setattr(
-        commands.metadata_manager,
-        "save_metadata",
-        lambda snapshot: metadata_manager.MetadataWriteResult(path=save_path, backup_path=None),
-    )
+    save_metadata_events = metadata_manager.save_metadata_events
+
+    def fake_save_metadata_events(project_id, events, *, location=None):
+        return save_metadata_events(project_id, events, location=location, base_dir=tmp_path)
+
+    monkeypatch.setattr(commands.metadata_manager, "save_metadata_events", fake_save_metadata_events)
 
     inputs = iter(["1", ""])
     monkeypatch.setattr(commands, "_prompt_user", lambda _: next(inputs))
@@ -118,6 +52,8 @@ def test_init_happy_path(monkeypatch, tmp_path):
     assert captured["sample_n"] == 3
     assert captured["project_id"] == "demo"
     assert captured["account_id"] == 1
+    written = (tmp_path / "project" / "demo" / "metadata.md").read_text(encoding="utf-8")
+    assert "### テーブル `sales.orders`" in written
 
 
 def test_init_cancelled(monkeypatch):
@@ -147,3 +83,56 @@ def test_handle_command_routes_init(monkeypatch):
     handled, reply = commands.handle_command("/init")
     assert handled is True
     assert reply == "done"
+
+
+def test_init_selects_project_by_id(monkeypatch):
+    monkeypatch.setattr(commands.models, "list_accounts", lambda: [{"id": 1, "refresh_token": "tok"}])
+    projects = [{"projectId": "alpha"}, {"projectReference": {"projectId": "beta"}}, {"friendlyName": "no id"}]
+    monkeypatch.setattr(commands.bq_client, "list_projects", lambda account_id: projects)
+
+    chosen = {}
+
+    class DummyClient:
+        def __init__(self, project_id: str, account_id: int):
+            chosen["project_id"] = project_id
+
+        def list_datasets(self):
+            return ["sales"]
+
+    monkeypatch.setattr(commands.bq_client, "BQClient", DummyClient)
+    inputs = iter(["gamma", "3", "beta", "q"])
+    monkeypatch.setattr(commands, "_prompt_user", lambda _: next(inputs))
+
+    message = commands._init()
+
+    assert chosen["project_id"] == "beta"
+    assert "キャンセル" in message
+
+
+def test_init_interrupted_returns_to_chat(monkeypatch):
+    monkeypatch.setattr(commands.models, "list_accounts", lambda: [{"id": 1, "refresh_token": "tok"}])
+    monkeypatch.setattr(commands.bq_client, "list_projects", lambda account_id: [{"projectId": "demo"}])
+
+    class DummyClient:
+        def __init__(self, project_id: str, account_id: int):
+            self.location = "US"
+
+        def list_datasets(self):
+            return ["sales"]
+
+    monkeypatch.setattr(commands.bq_client, "BQClient", DummyClient)
+
+    def interrupted(project_id, **kwargs):
+        raise KeyboardInterrupt
+        yield
+
+    monkeypatch.setattr(commands.bq_client, "iter_metadata_snapshot", interrupted)
+    inputs = iter(["1", ""])
+    monkeypatch.setattr(commands, "_prompt_user", lambda _: next(inputs))
+
+    assert "中断" in commands._init()
+
+
+def test_handle_command_ignores_unknown():
+    assert commands.handle_command("/unknown") == (False, None)
+    assert commands.handle_command("hello") == (False, None)
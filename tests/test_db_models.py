@@ -0,0 +1,201 @@
+import gc
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from wise.db import models
+
+
+@pytest.fixture()
+def db_path(tmp_path):
+    path = str(tmp_path / "wise.db")
+    models.init_db(path)
+    yield path
+    models.close_all()
+
+
+def test_add_messages_inserts_batch_in_order(db_path):
+    account_id = models.create_account("user@example.com", "tok", db_path=db_path)
+    session_id = models.create_session(account_id, db_path=db_path)
+
+    inserted = models.add_messages(
+        session_id,
+        [("user", "Hello"), ("assistant", "Hi there")],
+        db_path=db_path,
+    )
+
+    assert inserted == 2
+    rows = models.list_messages(session_id, db_path=db_path)
+    assert [(r["role"], r["content"]) for r in rows] == [("user", "Hello"), ("assistant", "Hi there")]
+
+
+def test_add_messages_rejects_unknown_role(db_path):
+    account_id = models.create_account("user@example.com", "tok", db_path=db_path)
+    session_id = models.create_session(account_id, db_path=db_path)
+
+    with pytest.raises(ValueError):
+        models.add_messages(session_id, [("user", "ok"), ("tool", "nope")], db_path=db_path)
+
+    assert models.list_messages(session_id, db_path=db_path) == []
+
+
+def test_upsert_account_inserts_then_updates_token(db_path):
+    first = models.upsert_account("user@example.com", "tok-1", db_path=db_path)
+    second = models.upsert_account("user@example.com", "tok-2", db_path=db_path)
+
+    assert first == second
+    row = models.get_account_by_email("user@example.com", db_path=db_path)
+    assert row["refresh_token"] == "tok-2"
+    assert len(models.list_accounts(db_path=db_path)) == 1
+
+
+def test_list_accounts_sees_writes_through_cache(db_path):
+    assert models.list_accounts(db_path=db_path) == []
+    assert models.list_accounts(db_path=db_path) == []
+
+    models.upsert_account("user@example.com", "tok-1", db_path=db_path)
+    assert [r["refresh_token"] for r in models.list_accounts(db_path=db_path)] == ["tok-1"]
+
+    account_id = models.list_accounts(db_path=db_path)[0]["id"]
+    models.update_account_refresh_token(account_id, "tok-2", db_path=db_path)
+    assert [r["refresh_token"] for r in models.list_accounts(db_path=db_path)] == ["tok-2"]
+
+
+def test_init_db_enables_wal(db_path):
+    conn = models._connect(db_path)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    finally:
+        conn.close()
+
+
+def test_list_accounts_sees_external_writes_once_checkpointed(db_path):
+    assert models.list_accounts(db_path=db_path) == []
+
+    other = sqlite3.connect(db_path)
+    try:
+        other.execute("INSERT INTO accounts(email, refresh_token) VALUES ('x@example.com', 'tok')")
+        other.commit()
+        other.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        other.close()
+    # Coarse filesystem timestamps may not tick within a test; force it.
+    st = os.stat(db_path)
+    os.utime(db_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    assert [r["email"] for r in models.list_accounts(db_path=db_path)] == ["x@example.com"]
+
+
+def test_list_accounts_cache_survives_message_inserts(db_path):
+    account_id = models.create_account("user@example.com", "tok", db_path=db_path)
+    session_id = models.create_session(account_id, db_path=db_path)
+    assert len(models.list_accounts(db_path=db_path)) == 1
+
+    models.add_messages(session_id, [("user", "hi"), ("assistant", "hello")], db_path=db_path)
+    statements = []
+    models._get_conn(db_path).set_trace_callback(statements.append)
+    try:
+        assert len(models.list_accounts(db_path=db_path)) == 1
+    finally:
+        models._get_conn(db_path).set_trace_callback(None)
+    assert statements == []
+
+
+def test_connections_are_reused_per_thread(db_path):
+    conn = models._get_conn(db_path)
+    assert models._get_conn(db_path) is conn
+
+    other = []
+    worker = threading.Thread(target=lambda: other.append(models._get_conn(db_path)))
+    worker.start()
+    worker.join()
+    assert other[0] is not conn
+    # The worker's connection is released with the thread.
+    gc.collect()
+    with pytest.raises(sqlite3.ProgrammingError):
+        other[0].execute("SELECT 1")
+
+    models.close_all()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    assert models._get_conn(db_path) is not conn
+
+
+def test_add_messages_accepts_generator_and_empty_batch(db_path):
+    account_id = models.create_account("user@example.com", "tok", db_path=db_path)
+    session_id = models.create_session(account_id, db_path=db_path)
+
+    assert models.add_messages(session_id, iter([]), db_path=db_path) == 0
+    turn = ((role, f"{role} text") for role in ("user", "assistant"))
+    assert models.add_messages(session_id, turn, db_path=db_path) == 2
+    assert len(models.list_messages(session_id, db_path=db_path)) == 2
+
+
+def test_list_queries_use_indexes_without_sorting(db_path):
+    conn = models._get_conn(db_path)
+    plans = {
+        "messages": "SELECT * FROM messages WHERE session_id = ? ORDER BY created_at ASC",
+        "sessions": "SELECT * FROM sessions WHERE account_id = ? ORDER BY started_at DESC",
+    }
+    for table, sql in plans.items():
+        detail = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, (1,)))
+        assert f"idx_{table}_" in detail
+        assert "TEMP B-TREE" not in detail
+
+
+def test_close_db_only_closes_that_database(db_path, tmp_path):
+    other_path = str(tmp_path / "other.db")
+    models.init_db(other_path)
+    conn = models._get_conn(db_path)
+    other_conn = models._get_conn(other_path)
+
+    models.close_db(other_path)
+
+    assert models._get_conn(db_path) is conn
+    with pytest.raises(sqlite3.ProgrammingError):
+        other_conn.execute("SELECT 1")
+    models.close_db(db_path)
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
+def test_message_iteration_and_recent_window(db_path):
+    account_id = models.create_account("user@example.com", "tok", db_path=db_path)
+    session_id = models.create_session(account_id, db_path=db_path)
+    models.add_messages(session_id, [("user", f"m{i}") for i in range(5)], db_path=db_path)
+
+    rows = models.list_messages_iter(session_id, db_path=db_path)
+    assert next(rows)["content"] == "m0"
+    assert [r["content"] for r in rows] == ["m1", "m2", "m3", "m4"]
+    assert [r["content"] for r in models.list_messages_iter(session_id, limit=2, db_path=db_path)] == ["m0", "m1"]
+    assert [r["content"] for r in models.list_recent_messages(session_id, 2, db_path=db_path)] == ["m3", "m4"]
+
+
+def test_create_account_keeps_token_unless_given(db_path):
+    first = models.create_account("user@example.com", "tok-1", db_path=db_path)
+
+    assert models.create_account("user@example.com", db_path=db_path) == first
+    assert models.get_account_by_email("user@example.com", db_path=db_path)["refresh_token"] == "tok-1"
+
+    assert models.create_account("user@example.com", "tok-2", db_path=db_path) == first
+    assert models.get_account_by_email("user@example.com", db_path=db_path)["refresh_token"] == "tok-2"
+
+
+def test_list_tables_hides_sqlite_internals(db_path):
+    # AUTOINCREMENT creates the internal sqlite_sequence table.
+    assert models.list_tables(db_path=db_path) == ["accounts", "messages", "sessions"]
+
+
+def test_drop_tables_quotes_names(db_path):
+    conn = models._get_conn(db_path)
+    conn.execute('CREATE TABLE "odd ""name"" ; x" (id INTEGER)')
+    conn.execute("CREATE TABLE queries (id INTEGER)")
+    conn.commit()
+
+    dropped = models.drop_tables(['odd "name" ; x', "queries", "missing"], db_path=db_path)
+
+    assert dropped == ['odd "name" ; x', "queries"]
+    assert models.list_tables(db_path=db_path) == ["accounts", "messages", "sessions"]
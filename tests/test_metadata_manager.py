@@ -1,4 +1,6 @@
+import os
 from pathlib import Path
+import re
 import textwrap
 
 import pytest
@@ -101,3 +103,122 @@ def test_save_metadata_creates_backup(tmp_path: Path, monkeypatch, sample_snapsh
     assert result2.backup_path == metadata_path.with_name("metadata.md.bak.20240102T000000")
     assert result2.backup_path.read_text(encoding="utf-8") == "previous content"
     assert metadata_path.read_text(encoding="utf-8").startswith("# BigQuery メタデータ")
+
+
+def test_save_metadata_replaces_without_leftovers(tmp_path: Path, monkeypatch, sample_snapshot):
+    monkeypatch.setattr(manager, "_current_timestamp", lambda: "2024-01-01T00:00:00Z")
+    metadata_path = tmp_path / "project" / "demo" / "metadata.md"
+    metadata_path.parent.mkdir(parents=True)
+    metadata_path.write_text("previous content", encoding="utf-8")
+
+    result = manager.save_metadata(sample_snapshot, base_dir=tmp_path, backup=False)
+
+    assert result.backup_path is None
+    assert metadata_path.read_text(encoding="utf-8") == manager.render_metadata(sample_snapshot)
+    assert sorted(p.name for p in metadata_path.parent.iterdir()) == ["metadata.md"]
+
+
+def test_save_metadata_skips_unchanged_document(tmp_path: Path, monkeypatch, sample_snapshot):
+    monkeypatch.setattr(manager, "_current_timestamp", lambda: "2024-01-01T00:00:00Z")
+    first = manager.save_metadata(sample_snapshot, base_dir=tmp_path)
+    before = first.path.stat().st_mtime_ns
+
+    monkeypatch.setattr(manager, "_current_timestamp", lambda: "2024-01-02T00:00:00Z")
+    again = manager.save_metadata(sample_snapshot, base_dir=tmp_path)
+
+    assert again.unchanged is True
+    assert again.backup_path is None
+    assert again.path.stat().st_mtime_ns == before
+    assert sorted(p.name for p in again.path.parent.iterdir()) == ["metadata.md"]
+
+    sample_snapshot["location"] = "EU"
+    changed = manager.save_metadata(sample_snapshot, base_dir=tmp_path)
+    assert changed.unchanged is False
+    assert changed.backup_path is not None
+
+
+def test_save_metadata_events_matches_snapshot_render(tmp_path: Path, monkeypatch, sample_snapshot):
+    monkeypatch.setattr(manager, "_current_timestamp", lambda: "2024-01-01T00:00:00Z")
+    sample_snapshot["datasets"]["archive"] = {"tables": {}}
+    events = [("dataset", "sales")]
+    for table_id, entry in sample_snapshot["datasets"]["sales"]["tables"].items():
+        events.append(("table", "sales", table_id, entry["schema"], entry["sampleRows"]))
+    events.append(("dataset", "archive"))
+
+    result = manager.save_metadata_events("demo", iter(events), location="US", base_dir=tmp_path)
+
+    assert result.path.read_text(encoding="utf-8") == manager.render_metadata(sample_snapshot)
+
+
+def test_backups_share_explicit_timestamp(tmp_path: Path):
+    first = tmp_path / "metadata.md"
+    second = tmp_path / "snapshot.ndjson"
+    first.write_text("a", encoding="utf-8")
+    second.write_text("b", encoding="utf-8")
+
+    backups = [manager.datastore_files.create_backup(p, timestamp="20240102000000") for p in (first, second)]
+
+    assert [b.name for b in backups] == ["metadata.md.bak.20240102000000", "snapshot.ndjson.bak.20240102000000"]
+    assert backups[1].read_text(encoding="utf-8") == "b"
+
+
+def test_write_text_replaces_atomically(tmp_path: Path):
+    target = tmp_path / "nested" / "notes.md"
+    manager.datastore_files.write_text(target, "first")
+    manager.datastore_files.write_text(target, "second")
+
+    assert target.read_text(encoding="utf-8") == "second"
+    assert sorted(p.name for p in target.parent.iterdir()) == ["notes.md"]
+
+
+def test_current_timestamp_format():
+    assert re.fullmatch(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z", manager._current_timestamp())
+
+
+def test_create_backup_link_shares_inode(tmp_path: Path):
+    target = tmp_path / "metadata.md"
+    target.write_text("old", encoding="utf-8")
+
+    backup = manager.datastore_files.create_backup_link(target, timestamp="20240102000000")
+
+    assert backup.read_text(encoding="utf-8") == "old"
+    assert backup.stat().st_ino == target.stat().st_ino
+    # Replacing the original (as save_metadata does) leaves the backup intact.
+    replacement = tmp_path / "metadata.md.new"
+    replacement.write_text("new", encoding="utf-8")
+    os.replace(replacement, target)
+    assert backup.read_text(encoding="utf-8") == "old"
+
+
+def test_render_metadata_accepts_schema_generator():
+    schema = ({"name": name, "type": "STRING"} for name in ("b", "a"))
+    table = {"schema": schema, "sampleRows": [{"a": 1, "b": 2}]}
+    snapshot = {"projectId": "p", "datasets": {"d": {"tables": {"t": table}}}}
+
+    assert "| b | a |\n| --- | --- |\n| 2 | 1 |" in manager.render_metadata(snapshot)
+
+
+@pytest.mark.parametrize(
+    "entry",
+    [
+        {"tables": ["orders"]},
+        ["orders"],
+        {"tables": {"orders": None}},
+        {"tables": {"orders": {"schema": {"name": "id"}}}},
+        {"tables": {"orders": {"sampleRows": "id"}}},
+    ],
+)
+def test_save_metadata_rejects_malformed_snapshot_before_writing(tmp_path: Path, entry):
+    snapshot = {"projectId": "demo", "datasets": {"sales": entry}}
+
+    with pytest.raises(TypeError):
+        manager.save_metadata(snapshot, base_dir=tmp_path)
+
+    assert not (tmp_path / "project").exists()
+
+
+def test_save_metadata_rejects_missing_project_id_as_value_error(tmp_path: Path):
+    with pytest.raises(ValueError):
+        manager.save_metadata({"datasets": {}}, base_dir=tmp_path)
+
+    assert not (tmp_path / "project").exists()
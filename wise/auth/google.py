@@ -11,29 +11,46 @@ Requirements (declared in pyproject):
 
 from __future__ import annotations
 
+import functools
 import json
 import os
 from pathlib import Path
-from typing import Optional
-
-from google.auth.transport.requests import Request, AuthorizedSession
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
+from typing import TYPE_CHECKING, Optional
 
 from ..db import models
 
+try:  # optional fast JSON parser; falls back to the stdlib
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover - depends on environment
+    from json import loads as _json_loads
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from google.auth.transport.requests import AuthorizedSession
+    from google.oauth2.credentials import Credentials
+
+# google-auth / oauthlib pull in requests, cryptography, etc. They are imported
+# lazily inside the functions that need them so that importing ``wise.auth``
+# stays cheap for code paths that never run the OAuth flow.
+
 
 # Scopes needed now: BigQuery read for future calls, and OIDC userinfo to get email
-SCOPES = [
+SCOPES = (
     # OIDC + explicit userinfo scopes to avoid oauthlib scope-mismatch warnings
     "openid",
     "https://www.googleapis.com/auth/userinfo.email",
     "https://www.googleapis.com/auth/userinfo.profile",
     # BigQuery read-only for future API calls
     "https://www.googleapis.com/auth/bigquery.readonly",
-]
+)
 
+_USER_AGENT = "wise"
+_USERINFO_URL = "https://openidconnect.googleapis.com/v1/userinfo"
+# (connect, read) seconds: a slow DNS/TCP connect fails fast instead of
+# consuming the whole budget meant for the response body.
+_USERINFO_TIMEOUT = (3.0, 7.0)
 
+
+@functools.lru_cache(maxsize=1)
 def _client_secrets_path() -> Path:
     """Resolve client secrets JSON path.
 
@@ -41,6 +58,9 @@ def _client_secrets_path() -> Path:
       1) Env var WISE_GOOGLE_CLIENT_SECRETS
       2) ./cred.json (project root)
       3) ./client_secrets.json (alternative common name)
+
+    The result is cached for the life of the process; call
+    ``_client_secrets_path.cache_clear()`` to force re-resolution (e.g. tests).
     """
     env = os.getenv("WISE_GOOGLE_CLIENT_SECRETS")
     if env:
@@ -65,16 +85,33 @@ def _load_client_info(path: Path) -> dict:
     return data
 
 
+def _authorized_session(creds: Credentials) -> AuthorizedSession:
+    """Return the ``AuthorizedSession`` bound to ``creds``, creating it once.
+
+    The session is stored on the credentials object itself so that repeated
+    userinfo calls keep the HTTP connection (and TLS session) alive, and the
+    session is released together with the credentials.
+    """
+    session = getattr(creds, "_wise_session", None)
+    if session is None:
+        from google.auth.transport.requests import AuthorizedSession
+
+        session = AuthorizedSession(creds)
+        session.headers.update({"User-Agent": _USER_AGENT})
+        creds._wise_session = session
+    return session
+
+
 def _fetch_email(creds: Credentials) -> Optional[str]:
     """Fetch user's email via OIDC userinfo endpoint.
 
     Returns None if not available (e.g., scope missing or network issue).
     """
     try:
-        session = AuthorizedSession(creds)
-        resp = session.get("https://openidconnect.googleapis.com/v1/userinfo", timeout=10)
+        session = _authorized_session(creds)
+        resp = session.get(_USERINFO_URL, timeout=_USERINFO_TIMEOUT)
         if resp.status_code == 200:
-            data = resp.json()
+            data = _json_loads(resp.content)
             return data.get("email")
     except Exception:
         return None
@@ -86,12 +123,7 @@ def _save_account(creds: Credentials, fallback_email: Optional[str] = None) -> i
     if not email:
         # Ensure we have an email to satisfy schema; prompt minimally
         email = input("Google アカウントのメールアドレス（email スコープ未許可時の入力）: ").strip()
-    # Upsert account by email
-    acct = models.get_account_by_email(email)
-    if acct:
-        models.update_account_refresh_token(int(acct["id"]), creds.refresh_token)
-        return int(acct["id"])
-    return models.create_account(email=email, refresh_token=creds.refresh_token)
+    return models.upsert_account(email, creds.refresh_token)
 
 
 def run_oauth_and_save_account() -> int:
@@ -101,13 +133,17 @@ def run_oauth_and_save_account() -> int:
     """
     secrets = _client_secrets_path()
     if not secrets.exists():
+        # Drop the cached fallback so a retry after placing the file re-resolves
+        _client_secrets_path.cache_clear()
         raise FileNotFoundError(
             f"OAuth クライアントシークレットが見つかりません: {secrets}. "
             "環境変数 WISE_GOOGLE_CLIENT_SECRETS または ./cred.json を用意してください。"
         )
 
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
     # Run OAuth (forces consent to guarantee refresh_token issuance)
-    flow = InstalledAppFlow.from_client_secrets_file(str(secrets), scopes=SCOPES)
+    flow = InstalledAppFlow.from_client_secrets_file(str(secrets), scopes=list(SCOPES))
     creds = flow.run_local_server(
         port=0,
         prompt="consent",
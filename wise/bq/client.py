@@ -9,11 +9,15 @@ design doc.
 
 from __future__ import annotations
 
+import functools
 import json
 import os
+import threading
 import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Iterable, Optional, Tuple
+from typing import Any, Iterable, Iterator, Optional, Tuple
 
 from google.auth.transport.requests import AuthorizedSession, Request
 from google.oauth2.credentials import Credentials
@@ -21,9 +25,17 @@ from google.oauth2.credentials import Credentials
 from ..auth.google import SCOPES
 from ..db import models
 
+try:  # optional fast JSON parser for row-heavy responses; falls back to the stdlib
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover - depends on environment
+    from json import loads as _json_loads
+
 __all__ = [
     "BQClient",
     "BigQueryClientError",
+    "MetadataEvent",
+    "iter_metadata_snapshot",
+    "iter_query",
     "list_projects",
     "metadata_snapshot",
     "query",
@@ -53,7 +65,7 @@ def _request_json(
     response = session.request(method, url, params=params, json=json_data, timeout=timeout)
     if response.status_code >= 400:
         try:
-            payload = response.json()
+            payload = _json_loads(response.content)
         except ValueError:
             payload = response.text
         raise BigQueryClientError(
@@ -62,7 +74,7 @@ def _request_json(
     if not response.content:
         return {}
     try:
-        return response.json()
+        return _json_loads(response.content)
     except ValueError as exc:  # pragma: no cover - unexpected server bug
         raise BigQueryClientError("BigQuery API の応答を JSON として解析できませんでした。") from exc
 
@@ -83,6 +95,7 @@ def _resolve_account(account_id: Optional[int], *, db_path: Optional[str] = None
     raise BigQueryClientError("利用可能なアカウントが見つかりません。'wise login' で認証してください。")
 
 
+@functools.lru_cache(maxsize=1)
 def _load_client_info() -> dict[str, str]:
     env_path = os.getenv("WISE_GOOGLE_CLIENT_SECRETS")
     candidate: Optional[Path] = Path(env_path) if env_path else None
@@ -118,6 +131,13 @@ def _load_client_info() -> dict[str, str]:
     return config
 
 
+def _refresh_credentials(creds: Credentials) -> None:
+    try:
+        creds.refresh(Request())
+    except Exception as exc:  # pragma: no cover - network failure is rare
+        raise BigQueryClientError("アクセストークンのリフレッシュに失敗しました。") from exc
+
+
 def _build_credentials(client_info: dict[str, str], refresh_token: str) -> Credentials:
     try:
         creds = Credentials(
@@ -126,37 +146,147 @@ def _build_credentials(client_info: dict[str, str], refresh_token: str) -> Crede
             client_id=client_info["client_id"],
             client_secret=client_info["client_secret"],
             token_uri=client_info["token_uri"],
-            scopes=SCOPES,
+            scopes=list(SCOPES),
         )
-        creds.refresh(Request())
-    except Exception as exc:  # pragma: no cover - network failure is rare
+    except Exception as exc:  # pragma: no cover - malformed client config
         raise BigQueryClientError("アクセストークンのリフレッシュに失敗しました。") from exc
+    _refresh_credentials(creds)
     return creds
 
 
+# Authorized sessions per account id. Reusing one ``requests`` session keeps
+# its urllib3 connection pool (and TLS sessions) alive across BQClient
+# instances and list_projects calls. Entries record the refresh token they
+# were built from so a re-login replaces the session.
+_session_cache: dict[int, Tuple[str, AuthorizedSession, Credentials]] = {}
+
+# Sized for the parallel metadata sweep: _POOL_MAXSIZE must stay >=
+# _METADATA_MAX_WORKERS so every worker gets a pooled connection.
+_POOL_CONNECTIONS = 4
+_POOL_MAXSIZE = 32
+_METADATA_MAX_WORKERS = 16
+
+
+def _configure_session(session: AuthorizedSession) -> None:
+    """Mount a pooled, retrying HTTPS adapter and trim response payloads.
+
+    Google APIs only gzip responses when the User-Agent contains "gzip", and
+    pretty-print JSON unless ``prettyPrint=false`` is sent; both are set at
+    the session level so every BigQuery call benefits.
+    """
+
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(500, 502, 503, 504),
+        # Hand the final 5xx back to _request_json so it becomes a
+        # BigQueryClientError instead of a urllib3 MaxRetryError.
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=_POOL_CONNECTIONS, pool_maxsize=_POOL_MAXSIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip", "User-Agent": "wise (gzip)"})
+    session.params = {"prettyPrint": "false"}
+
+
 def _create_authorized_session(
     account_id: Optional[int],
     *,
     db_path: Optional[str] = None,
 ) -> Tuple[AuthorizedSession, Credentials, Any]:
-    client_info = _load_client_info()
     account = _resolve_account(account_id, db_path=db_path)
     refresh_token = account["refresh_token"]
     if not refresh_token:
         raise BigQueryClientError("指定されたアカウントに refresh_token が保存されていません。")
 
+    key = int(account["id"])
+    cached = _session_cache.get(key)
+    if cached is not None and cached[0] == refresh_token:
+        _, session, credentials = cached
+        # ``valid`` turns False a few minutes before expiry. Refresh the shared
+        # credentials in place so the pooled session (and its connections)
+        # survives; only a changed refresh token builds a new one.
+        if not credentials.valid:
+            _refresh_credentials(credentials)
+        return session, credentials, account
+
+    client_info = _load_client_info()
     credentials = _build_credentials(client_info, refresh_token)
     session = AuthorizedSession(credentials)
+    _configure_session(session)
+    _session_cache[key] = (refresh_token, session, credentials)
     return session, credentials, account
 
 
+_MISSING = object()
+
+# INFORMATION_SCHEMA reports Standard SQL type names; tables.get (and thus
+# get_table_schema) reports the legacy ones. Map the former onto the latter.
+_LEGACY_TYPE_NAMES = {"INT64": "INTEGER", "FLOAT64": "FLOAT", "BOOL": "BOOLEAN", "STRUCT": "RECORD"}
+
+# ("dataset", dataset_id) or ("table", dataset_id, table_id, schema, sample_rows)
+MetadataEvent = Tuple[Any, ...]
+
+
+class _TTLCache:
+    """Thread-safe, size-bounded cache whose entries expire after ``ttl`` seconds.
+
+    A dependency-free stand-in for ``cachetools.TTLCache``; oldest entries are
+    evicted first once ``maxsize`` is reached.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: OrderedDict[Any, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: Any) -> Any:
+        """Return the cached value or ``_MISSING`` when absent/expired."""
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return _MISSING
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self._ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+
+# Dataset lists and table schemas, shared by every BQClient in the process so
+# lookups survive the short-lived clients built per call (e.g. each /init).
+# Keys start with the account id, since visibility depends on the credentials.
+_METADATA_CACHE_TTL_SEC = 300.0
+_METADATA_CACHE_MAXSIZE = 1024
+_metadata_cache = _TTLCache(maxsize=_METADATA_CACHE_MAXSIZE, ttl=_METADATA_CACHE_TTL_SEC)
+
+
 class BQClient:
     """Minimal BigQuery REST client for metadata operations and SQL execution."""
 
     BASE_URL = "https://bigquery.googleapis.com/bigquery/v2"
     DEFAULT_TIMEOUT = 30
-    POLL_INTERVAL_SEC = 1.0
-    MAX_POLL_ATTEMPTS = 30
+    # Job polling: short first wait, ramping up geometrically, bounded by a
+    # wall-clock budget. jobs.query and every getQueryResults call ask the
+    # server to hold the request until the job finishes (up to
+    # POLL_TIMEOUT_MS), so most interactive queries complete in one round trip.
+    INITIAL_POLL_SEC = 0.1
+    POLL_MULTIPLIER = 1.5
+    MAX_POLL_SEC = 5.0
+    MAX_POLL_WALL_SEC = 300.0
+    POLL_TIMEOUT_MS = 10_000
 
     def __init__(
         self,
@@ -166,6 +296,7 @@ class BQClient:
         *,
         db_path: Optional[str] = None,
         timeout: Optional[float] = None,
+        session: Optional[AuthorizedSession] = None,
     ) -> None:
         if not project_id:
             raise ValueError("project_id は必須です。")
@@ -175,7 +306,12 @@ class BQClient:
         self.account_id: int
         self._timeout = timeout if timeout is not None else self.DEFAULT_TIMEOUT
 
-        session, credentials, account = _create_authorized_session(account_id, db_path=db_path)
+        if session is None:
+            session, credentials, account = _create_authorized_session(account_id, db_path=db_path)
+        else:
+            # Pre-built session (e.g. shared by the caller): only resolve the account id.
+            credentials = getattr(session, "credentials", None)
+            account = _resolve_account(account_id, db_path=db_path)
         self.account_id = int(account["id"])
         self._credentials = credentials
         self._session = session
@@ -187,42 +323,88 @@ class BQClient:
     def list_datasets(self) -> list[str]:
         """Return dataset IDs available in the configured project."""
 
+        key = ("datasets", self.account_id, self.project_id)
+        dataset_ids = _metadata_cache.get(key)
+        if dataset_ids is _MISSING:
+            dataset_ids = list(self.iter_datasets())
+            _metadata_cache.set(key, dataset_ids)
+        return list(dataset_ids)
+
+    def iter_datasets(self) -> Iterator[str]:
+        """Yield dataset IDs page by page as they are listed."""
+
         path = f"/projects/{self.project_id}/datasets"
         params = {"maxResults": 1000}
-        dataset_ids: list[str] = []
         for page in self._paginate(path, params=params):
             for ds in page.get("datasets", []):
                 ref = ds.get("datasetReference", {})
                 dataset_id = ref.get("datasetId")
                 if dataset_id:
-                    dataset_ids.append(dataset_id)
-        return dataset_ids
+                    yield dataset_id
 
     def list_tables(self, dataset_id: str) -> list[str]:
         """Return table IDs for a given dataset."""
 
+        return list(self.iter_tables(dataset_id))
+
+    def iter_tables(self, dataset_id: str) -> Iterator[str]:
+        """Yield table IDs for a given dataset page by page."""
+
         if not dataset_id:
             raise ValueError("dataset_id は必須です。")
+        return self._iter_table_ids(dataset_id)
+
+    def _iter_table_ids(self, dataset_id: str) -> Iterator[str]:
         path = f"/projects/{self.project_id}/datasets/{dataset_id}/tables"
         params = {"maxResults": 1000}
-        table_ids: list[str] = []
         for page in self._paginate(path, params=params):
             for table in page.get("tables", []):
                 ref = table.get("tableReference", {})
                 table_id = ref.get("tableId")
                 if table_id:
-                    table_ids.append(table_id)
-        return table_ids
+                    yield table_id
 
     def get_table_schema(self, dataset_id: str, table_id: str) -> list[dict[str, Any]]:
         """Return BigQuery field definitions for the specified table."""
 
         if not dataset_id or not table_id:
             raise ValueError("dataset_id と table_id は必須です。")
-        path = f"/projects/{self.project_id}/datasets/{dataset_id}/tables/{table_id}"
-        data = self._request("GET", path)
-        schema = (data.get("schema") or {}).get("fields")
-        return list(schema or [])
+        key = ("schema", self.account_id, self.project_id, dataset_id, table_id)
+        schema = _metadata_cache.get(key)
+        if schema is _MISSING:
+            path = f"/projects/{self.project_id}/datasets/{dataset_id}/tables/{table_id}"
+            data = self._request("GET", path)
+            schema = list((data.get("schema") or {}).get("fields") or [])
+            _metadata_cache.set(key, schema)
+        return list(schema)
+
+    def list_tables_with_schema(self, dataset_id: str) -> dict[str, list[dict[str, Any]]]:
+        """Return ``{table_id: fields}`` for every table in ``dataset_id`` in one query.
+
+        Reads ``INFORMATION_SCHEMA.COLUMNS`` (plus ``COLUMN_FIELD_PATHS`` for
+        descriptions) instead of issuing one ``tables.get`` per table. Fields
+        are synthesized in the same shape as :meth:`get_table_schema` returns
+        (``name``/``type``/``mode``/``description``) with legacy type names;
+        system-defined pseudo-columns such as ``_PARTITIONTIME`` are skipped
+        and nested RECORD sub-fields are not expanded.
+        """
+
+        if not dataset_id:
+            raise ValueError("dataset_id は必須です。")
+        prefix = f"`{self.project_id}.{dataset_id}.INFORMATION_SCHEMA"
+        sql = (
+            "SELECT c.table_name, c.column_name, c.data_type, c.is_nullable, p.description"
+            f" FROM {prefix}.COLUMNS` AS c"
+            f" LEFT JOIN {prefix}.COLUMN_FIELD_PATHS` AS p"
+            " ON p.table_name = c.table_name AND p.column_name = c.column_name"
+            " AND p.field_path = c.column_name"
+            " WHERE c.is_system_defined = 'NO'"
+            " ORDER BY c.table_name, c.ordinal_position"
+        )
+        schemas: dict[str, list[dict[str, Any]]] = {}
+        for row in self.iter_rows(sql):
+            schemas.setdefault(row["table_name"], []).append(self._field_from_column(row))
+        return schemas
 
     def sample_rows(self, dataset_id: str, table_id: str, max_results: int = 5) -> list[dict[str, Any]]:
         """Fetch sample rows using ``jobs.query`` with ``SELECT * ... LIMIT``.
@@ -247,50 +429,17 @@ class BQClient:
     ) -> dict[str, Any]:
         """Execute SQL via ``jobs.query`` and return schema/rows metadata."""
 
-        if not sql:
-            raise ValueError("SQL 文が空です。")
-        payload: dict[str, Any] = {
-            "query": sql,
-            "useLegacySql": False,
-            "location": self.location,
-            "maxResults": max_results,
-            "dryRun": dry_run,
-        }
-        data = self._request("POST", f"/projects/{self.project_id}/queries", json=payload)
-
-        job = data.get("jobReference", {})
-        job_id = job.get("jobId")
-        if not job_id:
-            raise BigQueryClientError("jobs.query の応答に jobId が含まれていません。", payload=data)
-
-        schema_fields = (data.get("schema") or {}).get("fields") or []
-        total_rows = self._coerce_int(data.get("totalRows"))
+        job_id, first_page = self._submit_query(sql, max_results=max_results, dry_run=dry_run)
+        schema_fields = self._schema_fields(first_page)
+        total_rows = self._coerce_int(first_page.get("totalRows"))
         rows: list[dict[str, Any]] = []
 
         if not dry_run:
-            rows.extend(self._format_rows(data.get("rows") or [], schema_fields))
-            page_token = self._next_page_token(data)
-            job_complete = data.get("jobComplete", True)
-
-            if not job_complete:
-                # Wait for the job to finish before returning rows.
-                finished = self._poll_for_completion(job_id, max_results=max_results)
-                if finished.get("schema") and not schema_fields:
-                    schema_fields = (finished.get("schema") or {}).get("fields") or schema_fields
-                rows.extend(self._format_rows(finished.get("rows") or [], schema_fields))
-                total_rows = self._coerce_int(finished.get("totalRows") or total_rows)
-                page_token = self._next_page_token(finished)
-                job_complete = finished.get("jobComplete", True)
-
-            if fetch_all and page_token:
-                rows.extend(
-                    self._fetch_remaining_rows(
-                        job_id,
-                        schema_fields=schema_fields,
-                        start_token=page_token,
-                        max_results=max_results,
-                    )
-                )
+            for schema_fields, page in self._iter_result_pages(
+                job_id, first_page, max_results=max_results, fetch_all=fetch_all
+            ):
+                total_rows = self._coerce_int(page.get("totalRows") or total_rows)
+                rows.extend(self._format_rows(page.get("rows") or [], schema_fields))
         result = {
             "schema": schema_fields,
             "rows": rows,
@@ -299,6 +448,23 @@ class BQClient:
         }
         return result
 
+    def iter_rows(
+        self,
+        sql: str,
+        *,
+        max_results: int = 1000,
+        fetch_all: bool = True,
+    ) -> Iterator[dict[str, Any]]:
+        """Execute SQL and yield rows as each result page arrives.
+
+        The query is submitted (and awaited) immediately; subsequent pages are
+        only requested as the caller consumes the iterator, so memory stays
+        bounded by one page regardless of the result size.
+        """
+
+        job_id, first_page = self._submit_query(sql, max_results=max_results, dry_run=False)
+        return self._iter_formatted_rows(job_id, first_page, max_results=max_results, fetch_all=fetch_all)
+
     # ---------------
     # Helper routines
     # ---------------
@@ -318,45 +484,88 @@ class BQClient:
         )
 
     def _paginate(self, path: str, *, params: Optional[dict[str, Any]] = None) -> Iterable[dict[str, Any]]:
-        token: Optional[str] = None
-        base_params = params or {}
+        # The URL and query dict are built once; only pageToken changes per page.
+        url = self._full_url(path)
+        query = dict(params or {})
         while True:
-            query = dict(base_params)
-            if token:
-                query["pageToken"] = token
-            data = self._request("GET", path, params=query)
+            data = _request_json(self._session, "GET", url, timeout=self._timeout, params=query)
             yield data
             token = self._next_page_token(data)
             if not token:
                 break
+            query["pageToken"] = token
 
     def _poll_for_completion(self, job_id: str, *, max_results: int) -> dict[str, Any]:
-        attempts = 0
+        deadline = time.monotonic() + self.MAX_POLL_WALL_SEC
+        delay = self.INITIAL_POLL_SEC
         while True:
-            if attempts >= self.MAX_POLL_ATTEMPTS:
-                raise BigQueryClientError("BigQuery ジョブが完了しませんでした (タイムアウト)。")
-            time.sleep(self.POLL_INTERVAL_SEC)
+            time.sleep(delay)
             data = self._request(
                 "GET",
                 f"/projects/{self.project_id}/queries/{job_id}",
-                params={"maxResults": max_results, "location": self.location},
+                params={
+                    "maxResults": max_results,
+                    "location": self.location,
+                    "timeoutMs": self.POLL_TIMEOUT_MS,
+                },
             )
             if data.get("jobComplete", True):
                 return data
-            attempts += 1
+            if time.monotonic() >= deadline:
+                raise BigQueryClientError("BigQuery ジョブが完了しませんでした (タイムアウト)。")
+            delay = min(delay * self.POLL_MULTIPLIER, self.MAX_POLL_SEC)
+
+    def _submit_query(self, sql: str, *, max_results: int, dry_run: bool) -> Tuple[str, dict[str, Any]]:
+        """Post ``jobs.query`` and return ``(job_id, first response page)``."""
+
+        if not sql:
+            raise ValueError("SQL 文が空です。")
+        payload: dict[str, Any] = {
+            "query": sql,
+            "useLegacySql": False,
+            "location": self.location,
+            "maxResults": max_results,
+            "dryRun": dry_run,
+            "timeoutMs": self.POLL_TIMEOUT_MS,
+            "useQueryCache": True,
+        }
+        data = self._request("POST", f"/projects/{self.project_id}/queries", json=payload)
+
+        job = data.get("jobReference", {})
+        job_id = job.get("jobId")
+        if not job_id:
+            raise BigQueryClientError("jobs.query の応答に jobId が含まれていません。", payload=data)
+        return job_id, data
 
-    def _fetch_remaining_rows(
+    def _iter_result_pages(
         self,
         job_id: str,
+        first_page: dict[str, Any],
         *,
-        schema_fields: list[dict[str, Any]],
-        start_token: str,
         max_results: int,
-    ) -> list[dict[str, Any]]:
-        rows: list[dict[str, Any]] = []
-        token: Optional[str] = start_token
+        fetch_all: bool,
+    ) -> Iterator[Tuple[list[dict[str, Any]], dict[str, Any]]]:
+        """Yield ``(schema_fields, page)`` for each result page of ``job_id``.
+
+        Waits for the job when ``first_page`` reports it incomplete, then
+        follows page tokens lazily when ``fetch_all`` is set.
+        """
+
+        schema_fields = self._schema_fields(first_page)
+        page = first_page
+        yield schema_fields, page
+
+        if not page.get("jobComplete", True):
+            # Wait for the job to finish before returning rows.
+            page = self._poll_for_completion(job_id, max_results=max_results)
+            schema_fields = schema_fields or self._schema_fields(page)
+            yield schema_fields, page
+
+        if not fetch_all:
+            return
+        token = self._next_page_token(page)
         while token:
-            data = self._request(
+            page = self._request(
                 "GET",
                 f"/projects/{self.project_id}/queries/{job_id}",
                 params={
@@ -365,11 +574,42 @@ class BQClient:
                     "location": self.location,
                 },
             )
-            if data.get("schema") and not schema_fields:
-                schema_fields[:] = (data.get("schema") or {}).get("fields") or []
-            rows.extend(self._format_rows(data.get("rows") or [], schema_fields))
-            token = self._next_page_token(data)
-        return rows
+            schema_fields = schema_fields or self._schema_fields(page)
+            yield schema_fields, page
+            token = self._next_page_token(page)
+
+    def _iter_formatted_rows(
+        self,
+        job_id: str,
+        first_page: dict[str, Any],
+        *,
+        max_results: int,
+        fetch_all: bool,
+    ) -> Iterator[dict[str, Any]]:
+        for schema_fields, page in self._iter_result_pages(
+            job_id, first_page, max_results=max_results, fetch_all=fetch_all
+        ):
+            yield from self._format_rows(page.get("rows") or [], schema_fields)
+
+    @staticmethod
+    def _field_from_column(row: dict[str, Any]) -> dict[str, Any]:
+        data_type = row.get("data_type") or ""
+        if data_type.startswith("ARRAY<") and data_type.endswith(">"):
+            data_type, mode = data_type[len("ARRAY<") : -1], "REPEATED"
+        else:
+            mode = "REQUIRED" if row.get("is_nullable") == "NO" else "NULLABLE"
+        # Drop parameters such as STRUCT<...>, STRING(10) or NUMERIC(10, 2).
+        base_type = data_type.partition("<")[0].partition("(")[0].strip()
+        return {
+            "name": row.get("column_name"),
+            "type": _LEGACY_TYPE_NAMES.get(base_type, base_type),
+            "mode": mode,
+            "description": row.get("description"),
+        }
+
+    @staticmethod
+    def _schema_fields(data: dict[str, Any]) -> list[dict[str, Any]]:
+        return (data.get("schema") or {}).get("fields") or []
 
     @staticmethod
     def _next_page_token(data: dict[str, Any]) -> Optional[str]:
@@ -388,18 +628,20 @@ class BQClient:
     def _format_rows(rows: Iterable[Any], schema_fields: list[dict[str, Any]]) -> list[dict[str, Any]]:
         if not rows or not schema_fields:
             return []
-        names = [field.get("name") for field in schema_fields]
+        # Positional column names; unnamed fields map to a placeholder key that
+        # is dropped afterwards so cell positions stay aligned.
+        names = tuple(field.get("name") or _MISSING for field in schema_fields)
+        has_unnamed = _MISSING in names
+        width = len(names)
         formatted: list[dict[str, Any]] = []
         for row in rows:
-            cells = row.get("f", []) if isinstance(row, dict) else []
-            mapped: dict[str, Any] = {}
-            for idx, name in enumerate(names):
-                if not name:
-                    continue
-                if idx < len(cells):
-                    mapped[name] = cells[idx].get("v")
-                else:
-                    mapped[name] = None
+            # BigQuery always sends {"f": [{"v": ...}, ...]} for each row.
+            values = [cell["v"] for cell in row["f"]]
+            if len(values) < width:
+                values.extend([None] * (width - len(values)))
+            mapped = dict(zip(names, values))
+            if has_unnamed:
+                del mapped[_MISSING]
             formatted.append(mapped)
         return formatted
 
@@ -421,34 +663,119 @@ def query(
     return result.get("rows", [])
 
 
+def iter_query(
+    sql: str,
+    *,
+    project_id: str,
+    account_id: Optional[int] = None,
+    location: str = "US",
+    max_results: int = 1000,
+    fetch_all: bool = True,
+) -> Iterator[dict[str, Any]]:
+    """Streaming counterpart of :func:`query` yielding rows page by page."""
+
+    client = BQClient(project_id=project_id, account_id=account_id, location=location)
+    return client.iter_rows(sql, max_results=max_results, fetch_all=fetch_all)
+
+
 def list_projects(
     *,
     account_id: Optional[int] = None,
     db_path: Optional[str] = None,
     timeout: Optional[float] = None,
+    session: Optional[AuthorizedSession] = None,
 ) -> list[dict[str, Any]]:
     """Return available BigQuery projects for the authenticated account."""
 
-    session, _, _ = _create_authorized_session(account_id, db_path=db_path)
+    if session is None:
+        session, _, _ = _create_authorized_session(account_id, db_path=db_path)
     url = f"{BQClient.BASE_URL}/projects"
     effective_timeout = timeout if timeout is not None else BQClient.DEFAULT_TIMEOUT
     projects: list[dict[str, Any]] = []
-    params = {"maxResults": 1000}
-    token: Optional[str] = None
+    query: dict[str, Any] = {"maxResults": 1000}
 
     while True:
-        query = dict(params)
-        if token:
-            query["pageToken"] = token
         data = _request_json(session, "GET", url, timeout=effective_timeout, params=query)
         projects.extend(data.get("projects", []))
         token = data.get("nextPageToken") or data.get("pageToken") or None
         if not token:
             break
+        query["pageToken"] = token
 
     return projects
 
 
+def _fetch_table_metadata(
+    client: BQClient,
+    dataset_id: str,
+    table_id: str,
+    sample_n: int,
+    schema: Optional[list[dict[str, Any]]] = None,
+) -> Tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    if schema is None:
+        schema = client.get_table_schema(dataset_id, table_id)
+    return schema, client.sample_rows(dataset_id, table_id, max_results=sample_n)
+
+
+def _resolve_event(head: Tuple[str, ...], future: Optional[Future]) -> MetadataEvent:
+    if future is None:
+        return head
+    schema, samples = future.result()
+    return (*head, schema, samples)
+
+
+def iter_metadata_snapshot(
+    project_id: str,
+    *,
+    account_id: Optional[int] = None,
+    location: str = "US",
+    datasets: Optional[list[str]] = None,
+    sample_n: int = 3,
+) -> Iterator[MetadataEvent]:
+    """Yield project metadata as a stream of events, in listing order.
+
+    Events:
+      - ``("dataset", dataset_id)``
+      - ``("table", dataset_id, table_id, schema, sample_rows)``
+
+    Schemas are read with one INFORMATION_SCHEMA query per dataset; when that
+    is unavailable (or misses a table) the per-table ``tables.get`` is used.
+    Sample-row requests (and any fallback schema fetches) are independent
+    round-trips, so they are fanned out over a thread pool sharing the
+    client's pooled session. Only a bounded window of tables is in flight or
+    buffered at once, so memory does not grow with the project size.
+    """
+
+    client = BQClient(project_id=project_id, account_id=account_id, location=location)
+    dataset_ids = datasets or client.iter_datasets()
+    window = _METADATA_MAX_WORKERS * 2
+    pending: deque[Tuple[Tuple[str, ...], Optional[Future]]] = deque()
+
+    executor = ThreadPoolExecutor(max_workers=_METADATA_MAX_WORKERS)
+    try:
+        for dataset_id in dataset_ids:
+            pending.append((("dataset", dataset_id), None))
+            try:
+                schemas = client.list_tables_with_schema(dataset_id)
+            except BigQueryClientError:
+                schemas = {}
+            for table_id in client.iter_tables(dataset_id):
+                future = executor.submit(
+                    _fetch_table_metadata, client, dataset_id, table_id, sample_n, schemas.get(table_id)
+                )
+                pending.append((("table", dataset_id, table_id), future))
+                while len(pending) > window:
+                    yield _resolve_event(*pending.popleft())
+        while pending:
+            yield _resolve_event(*pending.popleft())
+    except BaseException:
+        # Failure, Ctrl-C or an abandoned iterator: drop queued work and return
+        # without waiting for requests that are already in flight.
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+
+
 def metadata_snapshot(
     project_id: str,
     *,
@@ -457,27 +784,31 @@ def metadata_snapshot(
     datasets: Optional[list[str]] = None,
     sample_n: int = 3,
 ) -> dict[str, Any]:
-    """Collect datasets/tables/schema/sample rows for later rendering."""
+    """Collect datasets/tables/schema/sample rows for later rendering.
 
-    client = BQClient(project_id=project_id, account_id=account_id, location=location)
-    dataset_ids = datasets or client.list_datasets()
+    Assembles the nested snapshot dict from :func:`iter_metadata_snapshot`.
+    """
 
     snapshot: dict[str, Any] = {
         "projectId": project_id,
         "location": location,
         "datasets": {},
     }
-
-    for dataset_id in dataset_ids:
-        tables = client.list_tables(dataset_id)
-        dataset_entry: dict[str, Any] = {"tables": {}}
-        for table_id in tables:
-            schema = client.get_table_schema(dataset_id, table_id)
-            samples = client.sample_rows(dataset_id, table_id, max_results=sample_n)
-            dataset_entry["tables"][table_id] = {
+    events = iter_metadata_snapshot(
+        project_id,
+        account_id=account_id,
+        location=location,
+        datasets=datasets,
+        sample_n=sample_n,
+    )
+    for event in events:
+        if event[0] == "dataset":
+            snapshot["datasets"][event[1]] = {"tables": {}}
+        else:
+            _, dataset_id, table_id, schema, samples = event
+            snapshot["datasets"][dataset_id]["tables"][table_id] = {
                 "schema": schema,
                 "sampleRows": samples,
             }
-        snapshot["datasets"][dataset_id] = dataset_entry
 
     return snapshot
@@ -7,7 +7,7 @@ Currently supports:
 
 from __future__ import annotations
 
-from typing import Tuple
+from typing import Callable, Tuple
 
 from ..auth import run_oauth_and_save_account
 from ..bq import client as bq_client
@@ -39,8 +39,9 @@ def _project_id_from(project: dict[str, object]) -> str:
     return ""
 
 
-def _project_label(project: dict[str, object]) -> str:
-    project_id = _project_id_from(project)
+def _project_label(project: dict[str, object], project_id: str | None = None) -> str:
+    if project_id is None:
+        project_id = _project_id_from(project)
     friendly = project.get("friendlyName") if isinstance(project, dict) else None
     if isinstance(friendly, str) and friendly and friendly != project_id:
         return f"{project_id} ({friendly})"
@@ -59,16 +60,22 @@ def _init(sample_n: int = 3) -> str:
     except bq_client.BigQueryClientError as exc:
         return f"プロジェクト一覧の取得に失敗しました: {exc}"
 
-    available = [p for p in projects if _project_id_from(p)]
-    if not available:
+    # Resolve each project's id/label once; selection below only needs the id.
+    entries: list[tuple[str, str]] = []
+    for project in projects:
+        pid = _project_id_from(project)
+        if pid:
+            entries.append((pid, _project_label(project, pid)))
+    if not entries:
         return "利用可能なプロジェクトが見つかりませんでした。"
+    known_ids = {pid for pid, _ in entries}
 
-    print(f"{len(available)} 件のプロジェクトが見つかりました。対象を選択してください (空行でキャンセル)。")
-    for idx, project in enumerate(available, start=1):
-        print(f"  [{idx}] {_project_label(project)}")
+    print(f"{len(entries)} 件のプロジェクトが見つかりました。対象を選択してください (空行でキャンセル)。")
+    for idx, (_, label) in enumerate(entries, start=1):
+        print(f"  [{idx}] {label}")
 
-    selected: dict[str, object] | None = None
-    while selected is None:
+    project_id: str | None = None
+    while project_id is None:
         try:
             raw = _prompt_user("project> ").strip()
         except KeyboardInterrupt:
@@ -78,18 +85,13 @@ def _init(sample_n: int = 3) -> str:
             return "プロジェクト選択をキャンセルしました。"
         if raw.isdigit():
             idx = int(raw)
-            if 1 <= idx <= len(available):
-                selected = available[idx - 1]
-                break
-        else:
-            for candidate in available:
-                if _project_id_from(candidate) == raw:
-                    selected = candidate
-                    break
-        if selected is None:
+            if 1 <= idx <= len(entries):
+                project_id = entries[idx - 1][0]
+        elif raw in known_ids:
+            project_id = raw
+        if project_id is None:
             print("有効な番号または projectId を入力してください。")
 
-    project_id = _project_id_from(selected)
     print(f"プロジェクト `{project_id}` を選択しました。データセットを確認しています...")
 
     try:
@@ -113,22 +115,29 @@ def _init(sample_n: int = 3) -> str:
         print("対象データセットが見つかりませんでした。空のメタデータを生成します。")
 
     print("BigQuery からメタデータを収集中です...")
+    # Tables are rendered into metadata.md as they are fetched; the full
+    # snapshot is never held in memory.
+    events = bq_client.iter_metadata_snapshot(
+        project_id,
+        account_id=account_id,
+        location=client.location,
+        datasets=list(dataset_ids),
+        sample_n=sample_n,
+    )
     try:
-        snapshot = bq_client.metadata_snapshot(
-            project_id=project_id,
-            account_id=account_id,
-            location=client.location,
-            datasets=list(dataset_ids),
-            sample_n=sample_n,
-        )
+        result = metadata_manager.save_metadata_events(project_id, events, location=client.location)
     except bq_client.BigQueryClientError as exc:
         return f"メタデータの取得に失敗しました: {exc}"
-
-    try:
-        result = metadata_manager.save_metadata(snapshot)
+    except KeyboardInterrupt:
+        # Ctrl-C during the (potentially long) sweep returns to the chat
+        # instead of terminating the session.
+        print()
+        return "メタデータ生成を中断しました。"
     except Exception as exc:  # pragma: no cover - unexpected filesystem issues
         return f"メタデータの保存に失敗しました: {exc}"
 
+    if result.unchanged:
+        return f"メタデータに変更はありませんでした ({result.path})。"
     message = f"メタデータを生成し {result.path} に保存しました。"
     if result.backup_path:
         message += f" 既存ファイルは {result.backup_path} にバックアップしました。"
@@ -142,14 +151,21 @@ def _login() -> str:
     return "認証が完了し、トークンを保存しました。"
 
 
+# Slash command -> handler. The lambdas resolve the handler at call time so
+# it stays patchable on the module.
+_COMMANDS: dict[str, Callable[[], str]] = {
+    "/login": lambda: _login(),
+    "/reauth": lambda: _login(),
+    "/init": lambda: _init(),
+}
+
+
 def handle_command(command: str) -> Tuple[bool, str | None]:
     """Handle a slash command.
 
     Returns (handled, reply). If not handled, (False, None).
     """
-    cmd = command.strip()
-    if cmd in {"/login", "/reauth"}:
-        return True, _login()
-    if cmd == "/init":
-        return True, _init()
-    return False, None
+    handler = _COMMANDS.get(command.strip())
+    if handler is None:
+        return False, None
+    return True, handler()
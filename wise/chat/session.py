@@ -65,10 +65,10 @@ def start_session() -> None:
                 continue
             # Fall-through if not handled: treat as normal text
 
-        # Persist user message
-        models.add_message(session_id, role="user", content=text)
-
-        # For now, echo as assistant and persist
+        # Persist the user turn before producing the reply, so it survives a
+        # failed or interrupted reply.
+        models.add_message(session_id, "user", text)
+        # For now, echo as assistant; the reply's messages share one transaction
         assistant_reply = f"Echo: {text}"
         print(f"assistant> {assistant_reply}")
-        models.add_message(session_id, role="assistant", content=assistant_reply)
+        models.add_messages(session_id, [("assistant", assistant_reply)])
@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
+import os
 import shutil
-from datetime import datetime, timezone
+import time
 from pathlib import Path
-from typing import Optional, Union
+from typing import Optional, TextIO, Union
 
 PROJECT_ROOT_DIRNAME = "project"
 PathLike = Union[str, Path]
@@ -41,30 +42,81 @@ def metadata_path(project_id: str, *, base_dir: Optional[PathLike] = None) -> Pa
 
 
 def write_text(path: PathLike, content: str) -> Path:
-    """Write ``content`` to ``path`` ensuring parent directories exist."""
+    """Write ``content`` to ``path`` ensuring parent directories exist.
+
+    The content goes to a sibling ``.tmp`` file first and is swapped in with
+    ``os.replace``, so readers never observe a partially written file.
+    """
 
     target = Path(path)
     ensure_directory(target.parent)
-    target.write_text(content, encoding="utf-8")
+    tmp = target.with_name(target.name + ".tmp")
+    try:
+        tmp.write_text(content, encoding="utf-8")
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
     return target
 
 
+def open_text(path: PathLike, *, buffering: int = 1 << 16) -> TextIO:
+    """Open ``path`` for buffered UTF-8 writing, creating parent directories.
+
+    For streaming writers that should not build their output in memory.
+    """
+
+    target = Path(path)
+    ensure_directory(target.parent)
+    return target.open("w", encoding="utf-8", buffering=buffering)
+
+
 def _timestamp_for_backup() -> str:
-    return datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    return time.strftime("%Y%m%d%H%M%S", time.gmtime())
+
+
+def backup_path_for(path: PathLike, *, timestamp: Optional[str] = None) -> Path:
+    """Return the timestamped backup path for ``path`` (nothing is written).
+
+    Pass ``timestamp`` to give several backups taken together the same suffix.
+    """
+
+    source = Path(path)
+    return source.with_name(f"{source.name}.bak.{timestamp or _timestamp_for_backup()}")
 
 
-def create_backup(path: PathLike) -> Path:
+def create_backup(path: PathLike, *, timestamp: Optional[str] = None) -> Path:
     """Create a timestamped backup copy of ``path`` and return it."""
 
     source = Path(path)
     if not source.exists():
         raise FileNotFoundError(f"バックアップ対象が存在しません: {source}")
-    backup = source.with_name(f"{source.name}.bak.{_timestamp_for_backup()}")
+    backup = backup_path_for(source, timestamp=timestamp)
     ensure_directory(backup.parent)
     shutil.copy2(source, backup)
     return backup
 
 
+def create_backup_link(path: PathLike, *, timestamp: Optional[str] = None) -> Path:
+    """Back up ``path`` by hard-linking it to its timestamped backup name.
+
+    No bytes are copied and ``path`` itself stays in place, so it can then be
+    atomically replaced. Falls back to a copy where hard links are not
+    available (e.g. some network or FAT filesystems).
+    """
+
+    source = Path(path)
+    if not source.exists():
+        raise FileNotFoundError(f"バックアップ対象が存在しません: {source}")
+    backup = backup_path_for(source, timestamp=timestamp)
+    backup.unlink(missing_ok=True)
+    try:
+        os.link(source, backup)
+    except OSError:
+        shutil.copy2(source, backup)
+    return backup
+
+
 def save(path: PathLike, content: str) -> Path:
     """Compatibility wrapper around :func:`write_text`."""
 
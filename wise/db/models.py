@@ -7,27 +7,160 @@ stored on the filesystem per the design.
 
 from __future__ import annotations
 
+import atexit
 from pathlib import Path
 import sqlite3
-from typing import Optional
+import threading
+import weakref
+from typing import Iterable, Iterator, Optional
 
 
 DEFAULT_DB_FILENAME = "wise.db"
 
+# ``INSERT ... RETURNING`` needs SQLite >= 3.35; older builds fall back to a
+# follow-up SELECT inside the same transaction.
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+# Applied to every new connection. With the WAL journal (enabled persistently
+# by init_db) synchronous=NORMAL is crash-safe and skips the per-commit fsync
+# of the main DB file; busy_timeout lets a writer wait for a concurrent one
+# instead of failing immediately with "database is locked".
+_CONNECTION_PRAGMAS = """
+PRAGMA foreign_keys = ON;
+PRAGMA synchronous = NORMAL;
+PRAGMA temp_store = MEMORY;
+PRAGMA cache_size = -65536;
+PRAGMA mmap_size = 268435456;
+PRAGMA busy_timeout = 3000;
+"""
+
+_MEMORY_DB = ":memory:"
+
+# Prepared statements kept per connection (keyed by SQL text). Connections are
+# long-lived, so every helper's statements stay compiled after first use.
+_STATEMENT_CACHE_SIZE = 256
+
+
+# list_accounts() results per DB file. Writes made through this module drop
+# the entry explicitly; the (mtime_ns, size) of the main DB file catches other
+# writers once their changes are checkpointed. The WAL is deliberately left
+# out: every message insert touches it, which would defeat the cache.
+_accounts_cache: dict[str, tuple[tuple[int, int], list[sqlite3.Row]]] = {}
+
+
+# ``./wise.db`` resolved against the working directory on first use, so the
+# helpers skip a getcwd() per call and a later chdir cannot split the DB.
+_default_db_file: Optional[Path] = None
+
+
+def _db_file(db_path: Optional[str] = None) -> Path:
+    global _default_db_file
+    if db_path:
+        return Path(db_path)
+    if _default_db_file is None:
+        _default_db_file = Path.cwd() / DEFAULT_DB_FILENAME
+    return _default_db_file
 
-def _connect(db_path: Optional[str] = None) -> sqlite3.Connection:
-    """Return a connection with foreign keys enabled.
+
+def _db_signature(db_file: Path) -> Optional[tuple[int, int]]:
+    try:
+        st = db_file.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _invalidate_accounts_cache(db_path: Optional[str] = None) -> None:
+    _accounts_cache.pop(str(_db_file(db_path)), None)
+
+
+def _connect(db_path: Optional[str] = None, *, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Return a connection with foreign keys enabled and tuned PRAGMAs.
 
     Args:
         db_path: Path to the SQLite DB file. Defaults to ``./wise.db``.
     """
-    db_file = Path(db_path) if db_path else Path.cwd() / DEFAULT_DB_FILENAME
-    conn = sqlite3.connect(db_file)
+    db_file = _db_file(db_path)
+    conn = sqlite3.connect(db_file, check_same_thread=check_same_thread, cached_statements=_STATEMENT_CACHE_SIZE)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
+    conn.executescript(_CONNECTION_PRAGMAS)
     return conn
 
 
+class _ThreadConnections:
+    """One thread's pooled connections by DB file; closed when the thread exits."""
+
+    __slots__ = ("conns", "__weakref__")
+
+    def __init__(self) -> None:
+        self.conns: dict[str, sqlite3.Connection] = {}
+
+    def __del__(self) -> None:
+        for conn in self.conns.values():
+            _close_conn(conn)
+
+
+# One long-lived connection per (DB file, thread). Opening a connection costs
+# a file open plus the PRAGMA setup and discards SQLite's page cache, so the
+# CRUD helpers reuse these and use ``with conn:`` for transactions. They live
+# in thread-local storage so a worker thread's connections are released with
+# it; the weak registry only lets close_db()/close_all() reach live threads.
+_local = threading.local()
+_THREAD_CONNS: weakref.WeakSet[_ThreadConnections] = weakref.WeakSet()
+_CONN_LOCK = threading.Lock()
+
+
+def _get_conn(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """Return the calling thread's cached connection to ``db_path``."""
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = _local.pool = _ThreadConnections()
+        with _CONN_LOCK:
+            _THREAD_CONNS.add(pool)
+    key = str(_db_file(db_path))
+    conn = pool.conns.get(key)
+    if conn is None:
+        # Never shared between threads; disabling the check only lets
+        # close_all() and thread teardown close it from another thread.
+        conn = pool.conns[key] = _connect(db_path, check_same_thread=False)
+    return conn
+
+
+def _close_conn(conn: sqlite3.Connection) -> None:
+    # Let SQLite refresh planner statistics for tables whose contents changed
+    # noticeably during this connection's lifetime; usually a no-op.
+    try:
+        conn.execute("PRAGMA optimize;")
+    except sqlite3.Error:
+        pass
+    finally:
+        conn.close()
+
+
+def close_db(db_path: Optional[str] = None) -> None:
+    """Optimize and close every cached connection to ``db_path``."""
+    db_key = str(_db_file(db_path))
+    with _CONN_LOCK:
+        conns = [c for pool in _THREAD_CONNS if (c := pool.conns.pop(db_key, None)) is not None]
+    for conn in conns:
+        _close_conn(conn)
+
+
+def close_all() -> None:
+    """Optimize and close every cached connection (at exit or between tests)."""
+    conns: list[sqlite3.Connection] = []
+    with _CONN_LOCK:
+        for pool in _THREAD_CONNS:
+            conns.extend(pool.conns.values())
+            pool.conns.clear()
+    for conn in conns:
+        _close_conn(conn)
+
+
+atexit.register(close_all)
+
+
 def init_db(db_path: Optional[str] = None) -> None:
     """Create design-doc compliant tables if they do not already exist.
 
@@ -35,8 +168,16 @@ def init_db(db_path: Optional[str] = None) -> None:
       - accounts(id, email, refresh_token, created_at)
       - sessions(id, account_id, started_at)
       - messages(id, session_id, role, content, created_at)
+
+    Indexes on ``messages(session_id, created_at)`` and
+    ``sessions(account_id, started_at)`` back the list helpers.
+
+    Also switches the database to the WAL journal; the mode is stored in the
+    file, so it only has to be set once.
     """
-    with _connect(db_path) as conn:
+    with _get_conn(db_path) as conn:
+        if str(db_path) != _MEMORY_DB:
+            conn.execute("PRAGMA journal_mode = WAL;")
         cur = conn.cursor()
         cur.executescript(
             """
@@ -62,6 +203,15 @@ def init_db(db_path: Optional[str] = None) -> None:
                 created_at TEXT NOT NULL DEFAULT (datetime('now')),
                 FOREIGN KEY(session_id) REFERENCES sessions(id) ON DELETE CASCADE
             );
+
+            -- Serve list_messages/list_sessions (and the ON DELETE CASCADE
+            -- lookups) from the index, already in ORDER BY order.
+            CREATE INDEX IF NOT EXISTS idx_messages_session_time
+                ON messages(session_id, created_at);
+            CREATE INDEX IF NOT EXISTS idx_sessions_account_time
+                ON sessions(account_id, started_at DESC);
+
+            PRAGMA optimize;
             """
         )
         conn.commit()
@@ -72,46 +222,75 @@ def init_db(db_path: Optional[str] = None) -> None:
 # ------------------------
 
 
+def _upsert_account(email: str, refresh_token: Optional[str], new_token_sql: str, db_path: Optional[str]) -> int:
+    """Run ``INSERT ... ON CONFLICT(email) DO UPDATE`` and return the account id.
+
+    ``new_token_sql`` is the expression stored in ``refresh_token`` when the
+    email already exists.
+    """
+    _invalidate_accounts_cache(db_path)
+    sql = (
+        "INSERT INTO accounts(email, refresh_token) VALUES (?, ?) "
+        f"ON CONFLICT(email) DO UPDATE SET refresh_token = {new_token_sql}"
+    )
+    with _get_conn(db_path) as conn:
+        if _HAS_RETURNING:
+            row = conn.execute(sql + " RETURNING id", (email, refresh_token)).fetchone()
+        else:
+            conn.execute(sql, (email, refresh_token))
+            row = conn.execute("SELECT id FROM accounts WHERE email = ?", (email,)).fetchone()
+        return int(row[0])
+
+
 def create_account(email: str, refresh_token: Optional[str] = None, db_path: Optional[str] = None) -> int:
     """Create an account, or return existing one if email already exists.
 
     If the email already exists, optionally updates the refresh token when
-    provided and returns the existing account id.
+    provided and returns the existing account id. Runs as one statement.
+    """
+    return _upsert_account(
+        email, refresh_token, "COALESCE(excluded.refresh_token, accounts.refresh_token)", db_path
+    )
+
+
+def upsert_account(email: str, refresh_token: Optional[str], db_path: Optional[str] = None) -> int:
+    """Insert the account or overwrite its refresh token; returns the account id.
+
+    Runs as a single ``INSERT ... ON CONFLICT(email) DO UPDATE`` statement so
+    concurrent logins for the same email cannot race between lookup and write.
     """
-    with _connect(db_path) as conn:
-        try:
-            cur = conn.execute(
-                "INSERT INTO accounts(email, refresh_token) VALUES (?, ?)",
-                (email, refresh_token),
-            )
-            conn.commit()
-            return int(cur.lastrowid)
-        except sqlite3.IntegrityError:
-            if refresh_token is not None:
-                conn.execute(
-                    "UPDATE accounts SET refresh_token = ? WHERE email = ?",
-                    (refresh_token, email),
-                )
-                conn.commit()
-            cur = conn.execute("SELECT id FROM accounts WHERE email = ?", (email,))
-            row = cur.fetchone()
-            return int(row[0])
+    return _upsert_account(email, refresh_token, "excluded.refresh_token", db_path)
 
 
 def get_account_by_email(email: str, db_path: Optional[str] = None) -> Optional[sqlite3.Row]:
-    with _connect(db_path) as conn:
+    with _get_conn(db_path) as conn:
         cur = conn.execute("SELECT * FROM accounts WHERE email = ?", (email,))
         return cur.fetchone()
 
 
 def list_accounts(db_path: Optional[str] = None) -> list[sqlite3.Row]:
-    with _connect(db_path) as conn:
+    """Return all accounts, newest first.
+
+    Results are cached until an account is written via this module or the
+    main DB file changes on disk, so repeated lookups cost a single ``stat``.
+    """
+    db_file = _db_file(db_path)
+    key = str(db_file)
+    signature = _db_signature(db_file)
+    cached = _accounts_cache.get(key)
+    if signature is not None and cached is not None and cached[0] == signature:
+        return list(cached[1])
+    with _get_conn(db_path) as conn:
         cur = conn.execute("SELECT * FROM accounts ORDER BY created_at DESC")
-        return list(cur.fetchall())
+        rows = cur.fetchall()
+    if signature is not None:
+        _accounts_cache[key] = (signature, rows)
+    return list(rows)
 
 
 def update_account_refresh_token(account_id: int, refresh_token: Optional[str], db_path: Optional[str] = None) -> None:
-    with _connect(db_path) as conn:
+    _invalidate_accounts_cache(db_path)
+    with _get_conn(db_path) as conn:
         conn.execute(
             "UPDATE accounts SET refresh_token = ? WHERE id = ?",
             (refresh_token, account_id),
@@ -125,7 +304,7 @@ def update_account_refresh_token(account_id: int, refresh_token: Optional[str],
 
 
 def create_session(account_id: int, db_path: Optional[str] = None) -> int:
-    with _connect(db_path) as conn:
+    with _get_conn(db_path) as conn:
         cur = conn.execute(
             "INSERT INTO sessions(account_id) VALUES (?)",
             (account_id,),
@@ -134,34 +313,95 @@ def create_session(account_id: int, db_path: Optional[str] = None) -> int:
         return int(cur.lastrowid)
 
 
+# Shared by add_message and add_messages; _ROLES mirrors the CHECK constraint
+# on messages.role.
+_INSERT_MESSAGE_SQL = "INSERT INTO messages(session_id, role, content) VALUES (?, ?, ?)"
+_ROLES = frozenset(("user", "assistant", "system"))
+_ROLE_ERROR = "role must be 'user', 'assistant', or 'system'"
+
+
 def add_message(session_id: int, role: str, content: str, db_path: Optional[str] = None) -> int:
-    if role not in {"user", "assistant", "system"}:
-        raise ValueError("role must be 'user', 'assistant', or 'system'")
-    with _connect(db_path) as conn:
+    if role not in _ROLES:
+        raise ValueError(_ROLE_ERROR)
+    with _get_conn(db_path) as conn:
         cur = conn.execute(
-            "INSERT INTO messages(session_id, role, content) VALUES (?, ?, ?)",
+            _INSERT_MESSAGE_SQL,
             (session_id, role, content),
         )
         conn.commit()
         return int(cur.lastrowid)
 
 
+def add_messages(
+    session_id: int,
+    items: Iterable[tuple[str, str]],
+    db_path: Optional[str] = None,
+) -> int:
+    """Insert ``(role, content)`` pairs for a session in a single transaction.
+
+    ``items`` is consumed lazily by ``executemany``; an invalid role rolls
+    back the whole batch. Returns the number of inserted rows.
+    """
+
+    def rows() -> Iterator[tuple[int, str, str]]:
+        for role, content in items:
+            if role not in _ROLES:
+                raise ValueError(_ROLE_ERROR)
+            yield (session_id, role, content)
+
+    with _get_conn(db_path) as conn:
+        cur = conn.executemany(_INSERT_MESSAGE_SQL, rows())
+    return max(cur.rowcount, 0)
+
+
 def list_messages(session_id: int, db_path: Optional[str] = None) -> list[sqlite3.Row]:
-    with _connect(db_path) as conn:
+    with _get_conn(db_path) as conn:
         cur = conn.execute(
             "SELECT * FROM messages WHERE session_id = ? ORDER BY created_at ASC",
             (session_id,),
         )
-        return list(cur.fetchall())
+        return cur.fetchall()
+
+
+def list_messages_iter(
+    session_id: int,
+    limit: Optional[int] = None,
+    db_path: Optional[str] = None,
+) -> Iterator[sqlite3.Row]:
+    """Yield a session's messages oldest first, fetching rows lazily.
+
+    ``limit`` caps the number of rows (``None`` returns all of them).
+    """
+    cur = _get_conn(db_path).execute(
+        "SELECT * FROM messages WHERE session_id = ? ORDER BY created_at ASC LIMIT ?",
+        (session_id, -1 if limit is None else limit),
+    )
+    yield from cur
+
+
+def list_recent_messages(session_id: int, limit: int, db_path: Optional[str] = None) -> list[sqlite3.Row]:
+    """Return the latest ``limit`` messages of a session, oldest first.
+
+    Reads backwards along ``idx_messages_session_time``, so the cost depends
+    on ``limit`` rather than on the length of the history.
+    """
+    with _get_conn(db_path) as conn:
+        cur = conn.execute(
+            "SELECT * FROM messages WHERE session_id = ? ORDER BY created_at DESC LIMIT ?",
+            (session_id, limit),
+        )
+        rows = cur.fetchall()
+    rows.reverse()
+    return rows
 
 
 def list_sessions(account_id: int, db_path: Optional[str] = None) -> list[sqlite3.Row]:
-    with _connect(db_path) as conn:
+    with _get_conn(db_path) as conn:
         cur = conn.execute(
             "SELECT * FROM sessions WHERE account_id = ? ORDER BY started_at DESC",
             (account_id,),
         )
-        return list(cur.fetchall())
+        return cur.fetchall()
 
 
 # Convenience utilities
@@ -169,7 +409,7 @@ def list_sessions(account_id: int, db_path: Optional[str] = None) -> list[sqlite
 
 def get_db_path(explicit: Optional[str] = None) -> str:
     """Return the DB path, defaulting to ``./wise.db`` if not provided."""
-    return str(Path(explicit) if explicit else (Path.cwd() / DEFAULT_DB_FILENAME))
+    return str(_db_file(explicit))
 
 
 # ------------------------
@@ -179,10 +419,15 @@ def get_db_path(explicit: Optional[str] = None) -> str:
 
 def list_tables(db_path: Optional[str] = None) -> list[str]:
     """Return user-defined table names (excluding SQLite internals)."""
-    with _connect(db_path) as conn:
-        cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-        names = [r[0] for r in cur.fetchall()]
-    return [n for n in names if not n.startswith("sqlite_")]
+    with _get_conn(db_path) as conn:
+        cur = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT GLOB 'sqlite_*' ORDER BY name"
+        )
+        return [r[0] for r in cur]
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
 
 
 def drop_tables(names: list[str], db_path: Optional[str] = None) -> list[str]:
@@ -191,10 +436,12 @@ def drop_tables(names: list[str], db_path: Optional[str] = None) -> list[str]:
     to_drop = [n for n in names if n in existing]
     if not to_drop:
         return []
-    with _connect(db_path) as conn:
+    with _get_conn(db_path) as conn:
+        # DDL does not open a transaction implicitly; without BEGIN every DROP
+        # would commit (and sync) on its own.
+        conn.execute("BEGIN")
         for n in to_drop:
-            conn.execute(f"DROP TABLE IF EXISTS {n}")
-        conn.commit()
+            conn.execute(f"DROP TABLE IF EXISTS {_quote_identifier(n)}")
     return to_drop
 
 
@@ -2,14 +2,42 @@
 
 from __future__ import annotations
 
+import functools
+import io
+import itertools
+import os
+import tempfile
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable, Iterator, Mapping, Sequence, TextIO
 
 from ..datastore import files as datastore_files
 
-__all__ = ["MetadataWriteResult", "render_metadata", "save_metadata"]
+__all__ = [
+    "MetadataWriteResult",
+    "render_metadata",
+    "save_metadata",
+    "save_metadata_events",
+    "write_metadata",
+    "write_metadata_events",
+]
+
+# Prefix of the only line that differs between renders of the same snapshot.
+_GENERATED_AT_PREFIX = "- 生成日時 (UTC): "
+
+# Row template for schema tables. Tables are emitted as a single
+# newline-joined entry rather than one list entry per row.
+_FIELD_ROW = "| %s | %s | %s | %s |"
+
+# Fixed Markdown fragments, shared by every table instead of rebuilt per call.
+_SCHEMA_HEADING = ("", "#### フィールド定義", "")
+_SCHEMA_TABLE_HEAD = "| 名前 | 型 | モード | 説明 |\n| --- | --- | --- | --- |\n"
+_SCHEMA_EMPTY = (*_SCHEMA_HEADING, "_スキーマ情報が利用できません。_", "")
+_SAMPLE_HEADING = ("", "#### サンプル行", "")
+_SAMPLE_EMPTY = (*_SAMPLE_HEADING, "_サンプル行は取得できませんでした。_", "")
+_SAMPLE_UNTABULAR = (*_SAMPLE_HEADING, "_サンプル行を表形式で表示できません。_", "")
+_NO_TABLES = ("_テーブルが存在しません。_", "")
 
 
 @dataclass(frozen=True)
@@ -18,12 +46,13 @@ class MetadataWriteResult:
 
     path: Path
     backup_path: Path | None = None
+    unchanged: bool = False
 
 
 def _current_timestamp() -> str:
     """Return an ISO8601 UTC timestamp without microseconds."""
 
-    return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
 def _escape_table_cell(value: Any) -> str:
@@ -33,123 +62,309 @@ def _escape_table_cell(value: Any) -> str:
     return text.replace("|", "\\|").replace("\n", "<br>")
 
 
-def _render_schema(fields: Iterable[dict[str, Any]]) -> list[str]:
-    lines = ["", "#### フィールド定義", ""]
-    field_list = list(fields or [])
-    if not field_list:
-        lines.append("_スキーマ情報が利用できません。_")
-        lines.append("")
-        return lines
+def _render_schema(fields: Sequence[dict[str, Any]]) -> Sequence[str]:
+    if not fields:
+        return _SCHEMA_EMPTY
 
-    lines.append("| 名前 | 型 | モード | 説明 |")
-    lines.append("| --- | --- | --- | --- |")
-    for field in field_list:
-        lines.append(
-            "| {name} | {type} | {mode} | {description} |".format(
-                name=_escape_table_cell(field.get("name")),
-                type=_escape_table_cell(field.get("type")),
-                mode=_escape_table_cell(field.get("mode")),
-                description=_escape_table_cell(field.get("description")),
-            )
+    rows = "\n".join(
+        _FIELD_ROW
+        % (
+            _escape_table_cell(field.get("name")),
+            _escape_table_cell(field.get("type")),
+            _escape_table_cell(field.get("mode")),
+            _escape_table_cell(field.get("description")),
         )
-    lines.append("")
-    return lines
+        for field in fields
+    )
+    return (*_SCHEMA_HEADING, _SCHEMA_TABLE_HEAD + rows, "")
 
 
 def _schema_column_names(fields: Iterable[dict[str, Any]]) -> list[str]:
-    names = [f.get("name") for f in fields if f.get("name")]
-    return [str(name) for name in names if name]
+    return [str(name) for field in fields if (name := field.get("name"))]
 
 
-def _render_sample_rows(fields: Iterable[dict[str, Any]], rows: Iterable[dict[str, Any]]) -> list[str]:
-    lines = ["", "#### サンプル行", ""]
-    row_list = list(rows or [])
-    if not row_list:
-        lines.append("_サンプル行は取得できませんでした。_")
-        lines.append("")
-        return lines
+@functools.lru_cache(maxsize=64)
+def _row_separator(width: int) -> str:
+    """Return the Markdown header separator row for ``width`` columns."""
+
+    return "| " + " | ".join(["---"] * width) + " |"
+
+
+def _render_sample_rows(fields: Sequence[dict[str, Any]], rows: Sequence[dict[str, Any]]) -> Sequence[str]:
+    if not rows:
+        return _SAMPLE_EMPTY
 
     columns = _schema_column_names(fields)
     if not columns:
-        keys = set()
-        for row in row_list:
-            keys.update(key for key in row.keys() if key)
+        # No usable schema: fall back to the union of the rows' own keys.
+        keys: set[str] = set()
+        for row in rows:
+            keys.update(filter(None, row))
         columns = sorted(keys)
 
     if not columns:
-        lines.append("_サンプル行を表形式で表示できません。_")
-        lines.append("")
-        return lines
+        return _SAMPLE_UNTABULAR
 
     header = "| " + " | ".join(_escape_table_cell(col) for col in columns) + " |"
-    separator = "| " + " | ".join("---" for _ in columns) + " |"
-    lines.extend([header, separator])
-    for row in row_list:
-        values = [_escape_table_cell(row.get(col)) for col in columns]
-        lines.append("| " + " | ".join(values) + " |")
-    lines.append("")
-    return lines
+    separator = _row_separator(len(columns))
+    # Column names are arbitrary strings, so rows are joined rather than
+    # formatted through a template keyed by column name. This is the hottest
+    # loop (rows x columns), so _escape_table_cell is inlined.
+    body = "\n".join(
+        "| "
+        + " | ".join(
+            [
+                "" if (value := row.get(col)) is None else str(value).replace("|", "\\|").replace("\n", "<br>")
+                for col in columns
+            ]
+        )
+        + " |"
+        for row in rows
+    )
+    return (*_SAMPLE_HEADING, f"{header}\n{separator}\n{body}", "")
+
 
+# ``{table_id: (schema, sample_rows)}`` with both sequences materialised.
+_Tables = dict[str, tuple[list[dict[str, Any]], list[dict[str, Any]]]]
 
-def _render_dataset(dataset_id: str, dataset_entry: dict[str, Any]) -> list[str]:
+
+def _as_list(value: Any, what: str) -> list[dict[str, Any]]:
+    if value is None:
+        return []
+    if isinstance(value, (str, bytes, Mapping)) or not isinstance(value, Iterable):
+        raise TypeError(f"{what} は list である必要があります。")
+    return list(value)
+
+
+def _table_pair(table: str, schema: Any, samples: Any) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    # Materialised once: both renderers read the schema, and the sample rows
+    # may be walked twice.
+    return _as_list(schema, f"テーブル `{table}` の schema"), _as_list(samples, f"テーブル `{table}` の sampleRows")
+
+
+def _render_dataset(dataset_id: str, tables: _Tables) -> list[str]:
     lines = ["", f"## データセット `{dataset_id}`", ""]
-    tables = dataset_entry.get("tables") or {}
     if not tables:
-        lines.append("_テーブルが存在しません。_")
-        lines.append("")
+        lines.extend(_NO_TABLES)
         return lines
 
-    for table_id, table_entry in sorted(tables.items()):
-        lines.extend(
-            [
-                "",
-                f"### テーブル `{dataset_id}.{table_id}`",
-            ]
-        )
-        schema = table_entry.get("schema") or []
-        samples = table_entry.get("sampleRows") or []
+    for table_id, (schema, samples) in sorted(tables.items()):
+        lines.append("")
+        lines.append(f"### テーブル `{dataset_id}.{table_id}`")
         lines.extend(_render_schema(schema))
         lines.extend(_render_sample_rows(schema, samples))
     return lines
 
 
-def render_metadata(snapshot: dict[str, Any]) -> str:
-    """Render a Markdown document from ``metadata_snapshot`` output."""
+@dataclass(frozen=True)
+class _Document:
+    """A validated snapshot, in the order and shape the renderer consumes."""
+
+    project_id: str
+    location: Any
+    datasets: list[tuple[str, _Tables]]
 
+
+def _normalize_snapshot(snapshot: dict[str, Any]) -> _Document:
+    """Validate ``snapshot`` and resolve every optional key exactly once.
+
+    Runs before any output is opened, so a malformed snapshot fails without
+    touching ``metadata.md`` instead of part-way through rendering.
+    """
+    if not isinstance(snapshot, Mapping):
+        raise TypeError("snapshot は dict である必要があります。")
     if not snapshot:
         raise ValueError("snapshot が空です。")
     project_id = snapshot.get("projectId")
     if not project_id:
         raise ValueError("snapshot には projectId が必要です。")
-
-    location = snapshot.get("location") or "未指定"
     datasets = snapshot.get("datasets") or {}
-    dataset_items = sorted(datasets.items(), key=lambda item: item[0])
+    if not isinstance(datasets, dict):
+        raise TypeError("snapshot の datasets は dataset_id をキーとする dict である必要があります。")
+    normalized: list[tuple[str, _Tables]] = []
+    for dataset_id, entry in sorted(datasets.items(), key=lambda item: item[0]):
+        tables = (entry.get("tables") or {}) if isinstance(entry, dict) else None
+        if not isinstance(tables, dict):
+            raise TypeError(f"データセット `{dataset_id}` の tables は table_id をキーとする dict である必要があります。")
+        pairs: _Tables = {}
+        for table_id, table_entry in tables.items():
+            if not isinstance(table_entry, dict):
+                raise TypeError(f"テーブル `{dataset_id}.{table_id}` のエントリは dict である必要があります。")
+            pairs[table_id] = _table_pair(
+                f"{dataset_id}.{table_id}", table_entry.get("schema"), table_entry.get("sampleRows")
+            )
+        normalized.append((dataset_id, pairs))
+    return _Document(str(project_id), snapshot.get("location"), normalized)
+
+
+def _iter_header_lines(
+    project_id: str, location: Any, summary: list[tuple[str, int]]
+) -> Iterator[str]:
+    """Yield the project overview and the dataset summary table."""
+
     generated_at = _current_timestamp()
 
-    lines: list[str] = [f"# BigQuery メタデータ: `{project_id}`", "", "## プロジェクト概要", ""]
-    lines.append(f"- プロジェクト ID: `{project_id}`")
-    lines.append(f"- ロケーション: `{location}`")
-    lines.append(f"- データセット数: {len(dataset_items)}")
-    lines.append(f"- 生成日時 (UTC): {generated_at}")
-    lines.append("")
-    lines.append("## 対象データセット一覧")
-    lines.append("")
-
-    if dataset_items:
-        lines.append("| データセット ID | テーブル数 |")
-        lines.append("| --- | --- |")
-        for dataset_id, dataset_entry in dataset_items:
-            tables = dataset_entry.get("tables") or {}
-            lines.append(f"| `{dataset_id}` | {len(tables)} |")
+    yield from (f"# BigQuery メタデータ: `{project_id}`", "", "## プロジェクト概要", "")
+    yield f"- プロジェクト ID: `{project_id}`"
+    yield f"- ロケーション: `{location or '未指定'}`"
+    yield f"- データセット数: {len(summary)}"
+    yield _GENERATED_AT_PREFIX + generated_at
+    yield ""
+    yield "## 対象データセット一覧"
+    yield ""
+
+    if summary:
+        rows = "\n".join(f"| `{dataset_id}` | {table_count} |" for dataset_id, table_count in summary)
+        yield "| データセット ID | テーブル数 |\n| --- | --- |\n" + rows
     else:
-        lines.append("_データセットが見つかりませんでした。_")
-    lines.append("")
+        yield "_データセットが見つかりませんでした。_"
+    yield ""
+
+
+def _iter_document_lines(document: _Document) -> Iterator[str]:
+    summary = [(dataset_id, len(tables)) for dataset_id, tables in document.datasets]
+
+    yield from _iter_header_lines(document.project_id, document.location, summary)
+    for dataset_id, tables in document.datasets:
+        yield from _render_dataset(dataset_id, tables)
+
+
+def _write_lines(lines: Iterable[str], out: TextIO) -> None:
+    """Write ``lines`` newline-joined, without trailing blank lines.
+
+    An entry may itself span several lines (tables are emitted whole); only
+    empty entries count as blank lines.
+
+    Equivalent to ``out.write("\n".join(lines).rstrip() + "\n")`` but never
+    holds the whole document in memory: blank lines are only emitted once a
+    following non-empty line shows they are not trailing.
+    """
+
+    pending = 0
+    started = False
+    for line in lines:
+        if not line:
+            pending += 1
+            continue
+        out.write("\n" * (pending + 1 if started else pending))
+        out.write(line)
+        pending = 0
+        started = True
+    out.write("\n")
+
+
+def write_metadata(snapshot: dict[str, Any], out: TextIO) -> None:
+    """Stream the Markdown document for ``snapshot`` into ``out``."""
+
+    _write_lines(_iter_document_lines(_normalize_snapshot(snapshot)), out)
+
+
+def render_metadata(snapshot: dict[str, Any]) -> str:
+    """Render a Markdown document from ``metadata_snapshot`` output."""
+
+    buf = io.StringIO()
+    write_metadata(snapshot, buf)
+    return buf.getvalue()
+
+
+def _iter_event_datasets(events: Iterable[Sequence[Any]]) -> Iterator[tuple[str, _Tables]]:
+    """Group ``iter_metadata_snapshot`` events into ``(dataset_id, tables)``.
+
+    Only the dataset currently being received is held in memory; events for
+    a dataset are expected to be contiguous, as the BigQuery client emits them.
+    """
+
+    current: tuple[str, _Tables] | None = None
+    for event in events:
+        if event[0] == "dataset":
+            if current is not None:
+                yield current
+            current = (event[1], {})
+        else:
+            _, dataset_id, table_id, schema, samples = event
+            if current is None or current[0] != dataset_id:
+                raise ValueError(f"データセット `{dataset_id}` のイベントより前にテーブルが届きました。")
+            current[1][table_id] = _table_pair(f"{dataset_id}.{table_id}", schema, samples)
+    if current is not None:
+        yield current
+
+
+def write_metadata_events(
+    project_id: str,
+    events: Iterable[Sequence[Any]],
+    out: TextIO,
+    *,
+    location: str | None = None,
+) -> None:
+    """Render metadata straight from snapshot events into ``out``.
 
-    for dataset_id, dataset_entry in dataset_items:
-        lines.extend(_render_dataset(dataset_id, dataset_entry))
+    Produces the same document as :func:`write_metadata` without building the
+    nested snapshot dict: each dataset section is rendered as soon as its
+    events are complete and spooled to a temporary file, since the overview
+    at the top of the document needs every dataset's table count first.
+    """
 
-    return "\n".join(lines).rstrip() + "\n"
+    if not project_id:
+        raise ValueError("snapshot には projectId が必要です。")
+    sections: dict[str, tuple[int, int, int]] = {}
+    with tempfile.TemporaryFile() as spool:
+        for dataset_id, tables in _iter_event_datasets(events):
+            start = spool.tell()
+            spool.write("".join(line + "\n" for line in _render_dataset(dataset_id, tables)).encode("utf-8"))
+            sections[dataset_id] = (len(tables), start, spool.tell())
+
+        def _body_lines() -> Iterator[str]:
+            for dataset_id in sorted(sections):
+                _, start, end = sections[dataset_id]
+                spool.seek(start)
+                yield from spool.read(end - start).decode("utf-8").split("\n")[:-1]
+
+        summary = [(dataset_id, sections[dataset_id][0]) for dataset_id in sorted(sections)]
+        header = _iter_header_lines(str(project_id), location, summary)
+        _write_lines(itertools.chain(header, _body_lines()), out)
+
+
+def _same_document(new_path: Path, old_path: Path) -> bool:
+    """Return True when both files match apart from the generated-at line."""
+
+    try:
+        if new_path.stat().st_size != old_path.stat().st_size:
+            return False
+        with new_path.open(encoding="utf-8") as new, old_path.open(encoding="utf-8") as old:
+            for new_line, old_line in itertools.zip_longest(new, old):
+                if new_line == old_line:
+                    continue
+                if new_line is None or old_line is None:
+                    return False
+                if not (new_line.startswith(_GENERATED_AT_PREFIX) and old_line.startswith(_GENERATED_AT_PREFIX)):
+                    return False
+    except (OSError, UnicodeDecodeError):
+        return False
+    return True
+
+
+def _replace_metadata_file(path: Path, write: Callable[[TextIO], None], backup: bool) -> MetadataWriteResult:
+    tmp_path = path.with_name(path.name + ".new")
+    try:
+        with datastore_files.open_text(tmp_path) as fh:
+            write(fh)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    # Re-running /init on an unchanged project would otherwise rewrite the
+    # file and pile up identical backups; only the timestamp would differ.
+    if path.exists() and _same_document(tmp_path, path):
+        tmp_path.unlink()
+        return MetadataWriteResult(path=path, unchanged=True)
+
+    backup_path: Path | None = None
+    if backup and path.exists():
+        # Hard-link rather than rename, so metadata.md never disappears
+        # between taking the backup and swapping in the new file.
+        backup_path = datastore_files.create_backup_link(path)
+    os.replace(tmp_path, path)
+    return MetadataWriteResult(path=path, backup_path=backup_path)
 
 
 def save_metadata(
@@ -158,15 +373,34 @@ def save_metadata(
     base_dir: Path | str | None = None,
     backup: bool = True,
 ) -> MetadataWriteResult:
-    """Persist rendered metadata to ``project/{project_id}/metadata.md``."""
+    """Persist rendered metadata to ``project/{project_id}/metadata.md``.
+
+    The document is streamed into a sibling ``metadata.md.new`` file which is
+    then swapped in with ``os.replace``. An existing file is backed up by
+    hard-linking it, so no bytes are copied and a crash mid-render never
+    leaves a truncated or missing ``metadata.md`` behind. When the existing
+    file differs only in its generation timestamp it is left untouched and
+    ``unchanged`` is set.
+    """
+
+    document = _normalize_snapshot(snapshot)
+    path = datastore_files.metadata_path(document.project_id, base_dir=base_dir)
+    return _replace_metadata_file(path, lambda fh: _write_lines(_iter_document_lines(document), fh), backup)
+
+
+def save_metadata_events(
+    project_id: str,
+    events: Iterable[Sequence[Any]],
+    *,
+    location: str | None = None,
+    base_dir: Path | str | None = None,
+    backup: bool = True,
+) -> MetadataWriteResult:
+    """Like :func:`save_metadata`, but rendering from ``iter_metadata_snapshot`` events."""
 
-    content = render_metadata(snapshot)
-    project_id = snapshot.get("projectId")
     if not project_id:
         raise ValueError("snapshot には projectId が必要です。")
-    path = datastore_files.metadata_path(str(project_id), base_dir=base_dir)
-    backup_path: Path | None = None
-    if backup and path.exists():
-        backup_path = datastore_files.create_backup(path)
-    datastore_files.write_text(path, content)
-    return MetadataWriteResult(path=path, backup_path=backup_path)
+    path = datastore_files.metadata_path(project_id, base_dir=base_dir)
+    return _replace_metadata_file(
+        path, lambda fh: write_metadata_events(project_id, events, fh, location=location), backup
+    )